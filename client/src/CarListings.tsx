@@ -40,6 +40,7 @@ import { zipCodeToState } from "./zipCodeToState";
 
 interface Car {
   id: number;
+  vin?: string;
   make: string;
   model: string;
   year: number;
@@ -65,14 +66,24 @@ interface Car {
   baseMsrp?: number;
 }
 
+interface ListingsPage {
+  cars: Car[];
+  cursor: string | null;
+  hasMore: boolean;
+}
+
+const EMPTY_PAGE: ListingsPage = { cars: [], cursor: null, hasMore: false };
+
+// Fetch one page of a search. The first page opens a search session whose
+// cursor (also sent as X-Search-Cursor) pulls the next pages; ids continue
+// from firstId so cards stay unique as pages are appended.
 const fetchListings = async (
-  state: string,
-  budget: number,
-  primaryUse: string
-): Promise<Car[]> => {
+  query: string,
+  firstId: number
+): Promise<ListingsPage> => {
   try {
     const apiUrl = import.meta.env.VITE_API_URL || 'http://localhost:8000';
-    const url = `${apiUrl}/listings/?state=${state}&budget=${budget}&primary_use=${primaryUse}`;
+    const url = `${apiUrl}/listings/?${query}`;
     console.log("🔍 Fetching from:", url);
     
     const res = await fetch(url);
@@ -81,23 +92,25 @@ const fetchListings = async (
     if (!res.ok) {
       const errorText = await res.text();
       console.error("❌ Response not OK:", res.status, errorText);
-      return [];
+      return EMPTY_PAGE;
     }
 
     const data = await res.json();
     console.log("📦 Response data:", data);
     console.log("📦 Listings keys:", data.listings ? Object.keys(data.listings) : "No listings");
+    const cursor = res.headers.get("X-Search-Cursor") || data.cursor || null;
+    const hasMore = Boolean(data.hasMore);
     
     if (!data.listings) {
       console.warn("⚠️ No listings in response");
-      return [];
+      return { cars: [], cursor, hasMore };
     }
 
     const entries = Object.entries(data.listings);
     console.log(`✅ Found ${entries.length} listings to process`);
     
-    return entries.map(
-      ([_vin, item]: [string, any], index) => {
+    const cars = entries.map(
+      ([vin, item]: [string, any], index) => {
         const retail = item.retailListing || {};
         const vehicle = item.vehicle || {};
         const ratings = item.ratings || {};
@@ -111,7 +124,8 @@ const fetchListings = async (
           : [];
 
         return {
-          id: index,
+          id: firstId + index,
+          vin,
           make: vehicle.make || "Unknown",
           model: vehicle.model || "N/A",
           year: vehicle.year || 0,
@@ -146,12 +160,13 @@ const fetchListings = async (
         };
       }
     );
+    return { cars, cursor, hasMore };
   } catch (err) {
     console.error("❌ Fetch failed:", err);
     if (err instanceof Error) {
       console.error("❌ Error details:", err.message, err.stack);
     }
-    return [];
+    return EMPTY_PAGE;
   }
 };
 
@@ -194,6 +209,9 @@ const calculateDepreciation = (currentPrice: number, currentAge: number, baseMsr
 const CarListings: React.FC = () => {
   const [cars, setCars] = useState<Car[]>([]);
   const [loading, setLoading] = useState(true);
+  const [cursor, setCursor] = useState<string | null>(null);
+  const [hasMore, setHasMore] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [filters, setFilters] = useState({
     make: "",
     model: "",
@@ -247,8 +265,13 @@ const CarListings: React.FC = () => {
           primaryUse = profile.comfortLevel || "Sedan";
         }
 
-        const data = await fetchListings(state, budget, primaryUse);
-        setCars(data);
+        const page = await fetchListings(
+          `state=${state}&budget=${budget}&primary_use=${primaryUse}`,
+          0
+        );
+        setCars(page.cars);
+        setCursor(page.cursor);
+        setHasMore(page.hasMore);
       } catch (err) {
         console.error("Error loading listings:", err);
       }
@@ -259,6 +282,19 @@ const CarListings: React.FC = () => {
     loadCars();
   }, [user]);
 
+  // Pull the next page of the open search session
+  const loadMore = async () => {
+    if (!cursor || loadingMore) return;
+    setLoadingMore(true);
+
+    const page = await fetchListings(`cursor=${encodeURIComponent(cursor)}`, cars.length);
+    setCars((prev) => [...prev, ...page.cars]);
+    // An expired session (410) comes back empty: stop offering more
+    setHasMore(page.hasMore);
+
+    setLoadingMore(false);
+  };
+
   // Carousel auto-slide
   useEffect(() => {
     if (!selectedCar) return;
@@ -284,7 +320,50 @@ const CarListings: React.FC = () => {
       setChatInput("");
       setChatSidebarOpen(false); // Close sidebar when switching cars
     }
-  }, [selectedCar]);
+  }, [selectedCar?.id]);
+
+  // Load the full photo gallery on demand (search results only carry the primary image)
+  useEffect(() => {
+    const vin = selectedCar?.vin;
+    if (!vin) return;
+
+    const apiUrl = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+    let cancelled = false;
+    fetch(`${apiUrl}/listings/${vin}/photos`)
+      .then((res) => (res.ok ? res.json() : null))
+      .then((data) => {
+        const images = data?.images;
+        if (cancelled || !Array.isArray(images) || !images.length) return;
+        setSelectedCar((car) => (car && car.vin === vin ? { ...car, images } : car));
+      })
+      .catch((err) => console.error("❌ Photo gallery fetch failed:", err));
+
+    return () => {
+      cancelled = true;
+    };
+  }, [selectedCar?.vin]);
+
+  // Load the AI ratings on demand (search results only carry the local deal/value scores)
+  useEffect(() => {
+    const vin = selectedCar?.vin;
+    if (!vin) return;
+
+    const apiUrl = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+    let cancelled = false;
+    fetch(`${apiUrl}/listings/${vin}/ratings`)
+      .then((res) => (res.ok ? res.json() : null))
+      .then((data) => {
+        const ratings = data?.ratings;
+        if (cancelled || !ratings) return;
+        setSelectedCar((car) => (car && car.vin === vin ? { ...car, ratings: { ...car.ratings, ...ratings } } : car));
+        setCars((list) => list.map((car) => (car.vin === vin ? { ...car, ratings: { ...car.ratings, ...ratings } } : car)));
+      })
+      .catch((err) => console.error("❌ Ratings fetch failed:", err));
+
+    return () => {
+      cancelled = true;
+    };
+  }, [selectedCar?.vin]);
 
   // Scroll chat to bottom when new messages arrive
   useEffect(() => {
@@ -715,6 +794,18 @@ const CarListings: React.FC = () => {
         </div>
       )}
 
+      {!loading && hasMore && (
+        <button className="load-more-btn" onClick={loadMore} disabled={loadingMore}>
+          {loadingMore ? (
+            <>
+              <Loader2 className="loading-spinner" size={18} /> Loading...
+            </>
+          ) : (
+            "Load more cars"
+          )}
+        </button>
+      )}
+
       {/* Modal */}
       {selectedCar && (
         <div
@@ -1,12 +1,13 @@
-from flask import Flask, request
-from flask_cors import CORS
+from quart import Quart
+from quart_cors import cors
 from .routes.recommendation import recommendations_bp
 from .routes.listings import listings_bp
+from .utils import admission, autodev, llm_accounting, metrics, profiling, traffic_capture
 import os
 from dotenv import load_dotenv
 
 def create_app():
-    app = Flask(__name__)
+    app = Quart(__name__)
 
     load_dotenv()
 
@@ -29,22 +30,47 @@ def create_app():
     if production_url:
         allowed_origins.append(production_url)
     
-    CORS(
+    app = cors(
         app,
-        origins=allowed_origins if allowed_origins else ["*"],
-        supports_credentials=True,
+        allow_origin=allowed_origins if allowed_origins else ["*"],
+        allow_credentials=True,
         allow_headers=["Content-Type", "Authorization"],
-        expose_headers=["Authorization"],
-        methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        expose_headers=["Authorization", "Retry-After", "X-Search-Cursor"],
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     )
     
     app.secret_key = os.getenv("SECRET_KEY")
 
+    # Opt-in request profiling (PROFILE_TOKEN header or PROFILE_SAMPLE_RATE)
+    profiling.init_app(app)
+    # Opt-in workload capture for replay_traffic.py (TRAFFIC_CAPTURE_PATH)
+    traffic_capture.init_app(app)
+    # Per-route-class concurrency limits; registered last so shed requests are still captured
+    admission.init_app(app)
+
+    # One pooled Auto.dev client per worker, closed with its event loop
+    app.after_serving(autodev.close_http_client)
+
     app.register_blueprint(recommendations_bp, url_prefix="/recommendations")
     app.register_blueprint(listings_bp, url_prefix="/listings")
+    # Plain async views: sync ones would be run on a worker thread, off the event loop
     @app.route("/")
-    def root():
-        return {"message": "HackPrincetonF25 backend running on AWS-ready Flask app"}
+    async def root():
+        return {"message": "HackPrincetonF25 backend running on AWS-ready Quart app"}
+
+    # Warm-up / liveness probe: must not touch OpenAI, requests or upstream APIs
+    @app.route("/healthz")
+    async def healthz():
+        return {"status": "ok"}
+
+    @app.route("/metrics")
+    async def get_metrics():
+        return {
+            "counters": metrics.snapshot(),
+            "llm": llm_accounting.snapshot(),
+            "admission": admission.controller.snapshot(),
+            "profiles": profiling.recent_reports(),
+        }
     
     
 
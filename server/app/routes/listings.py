@@ -1,19 +1,297 @@
-from flask import Blueprint, jsonify, request
-import json
-import requests
+from quart import Blueprint, jsonify, request
+import asyncio
 import os
-from ..utils.openai import get_car_recommendation, chat_about_car
-from ..utils.clean_data import clean_listings, get_filter_data
+import secrets
+import time
+from ..utils.openai import get_car_recommendation_async, chat_about_car_async, get_car_rating_async
+from ..utils.clean_data import clean_listings
+from ..utils.facets import FacetAccumulator
+from ..utils.autodev import get_auto_dev_headers, fetch_all_listings_async, fetch_all_photos_async
+from ..utils.query_planner import plan_queries
+from ..utils.cache import listings_cache, listing_store, search_sessions, ratings_cache, photo_cache, recommendations_cache, LISTINGS_CACHE_TTL, PHOTO_CACHE_TTL, PHOTO_MISS_TTL
+from ..utils.scoring import merge_llm_ratings
+from ..utils.local_recommendations import parse_budget, recommend_local
+from ..utils.recommendation_matrix import cell_key, lookup_recommendations
+from ..utils.geo import DEFAULT_RADIUS_MILES, MAX_RADIUS_MILES, load_zip_index, lookup_zip, normalize_zip, states_within, zips_within
+from ..utils import admission, metrics
+from ..utils.http_cache import compute_etag, conditional_json, not_modified
+from ..utils.records import pack_payload, unpack_payload
+from ..utils.chat_cache import car_from_record, lookup_answer, store_answer
 
 listings_bp = Blueprint("listings", __name__)
 
+# Seconds to wait for the LLM before continuing with the local ranking
+LLM_HEDGE_TIMEOUT = float(os.getenv("LLM_HEDGE_TIMEOUT", "4"))
+
+# Max VINs per batched /photos request
+MAX_PHOTO_BATCH = 50
+
+# Per-session fields of a /listings/ payload, left out of its ETag so identical
+# inventory keeps one tag across sessions, cache expiry and instances
+SESSION_FIELDS = ("page", "cursor", "hasMore")
+
+
+async def _hedged_recommendations(state, budget, primary_use, comfort):
+    """
+    Serve recommendations from an LLM-built precomputed matrix when it has the
+    cell (a local-built one would just freeze recommend_local). Otherwise ask the LLM (once per cell across workers, then cached), but
+    never wait longer than LLM_HEDGE_TIMEOUT in total: waiting on another
+    worker's call and making our own share one deadline. On timeout or
+    error fall back to the local catalog ranking.
+    """
+    recommendations = lookup_recommendations(state, budget, primary_use, comfort, sources=("llm",))
+    if recommendations is not None:
+        print(f"✅ Recommendation matrix provided {len(recommendations)} car suggestions")
+        metrics.increment("recommendations.source.matrix")
+        return recommendations
+
+    key = cell_key(state, budget, primary_use, comfort)
+    deadline = time.monotonic() + LLM_HEDGE_TIMEOUT
+    async with recommendations_cache.single_flight(key, timeout=LLM_HEDGE_TIMEOUT) as cached:
+        if cached is not None:
+            print(f"♻️ Serving {len(cached)} cached AI car suggestions")
+            metrics.increment("recommendations.source.llm_cached")
+            return cached
+
+        try:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # The whole budget went on waiting for another worker's call
+                raise asyncio.TimeoutError
+            rec_response = await asyncio.wait_for(
+                get_car_recommendation_async(state, budget, primary_use, comfort), timeout=remaining
+            )
+            if "error" in rec_response:
+                print(f"⚠️ AI recommendation failed ({rec_response['error']}), using local ranking")
+                metrics.increment("recommendations.source.local_fallback")
+            else:
+                # Output is already schema-validated by get_car_recommendation_async
+                recommendations = rec_response["recommendations"]
+                print(f"✅ AI provided {len(recommendations)} car suggestions")
+                metrics.increment("recommendations.source.llm")
+                recommendations_cache.set(key, recommendations)
+                return recommendations
+        except asyncio.TimeoutError:
+            print(f"⏱️ AI recommendation exceeded {LLM_HEDGE_TIMEOUT}s, using local ranking")
+            metrics.increment("recommendations.source.local_hedged")
+
+    recommendations = recommend_local(state, budget, primary_use, comfort)
+    print(f"✅ Local catalog provided {len(recommendations)} car suggestions")
+    return recommendations
+
+
+def _within_radius(car_listings, distances):
+    """
+    Drop raw Auto.dev listings whose ZIP lies outside the radius, before any
+    cleaning work. Listings with a missing ZIP, or one the centroid table
+    doesn't know, are kept (see _sort_by_distance).
+    """
+    known_zips = load_zip_index()["zips"]
+    kept = []
+    for entry in car_listings:
+        listings = []
+        for listing in entry.get("listings", []):
+            zip_code = normalize_zip(listing.get("retailListing", {}).get("zip"))
+            if zip_code in distances:
+                listings.append(listing)
+            elif zip_code not in known_zips:
+                metrics.increment("listings.radius.unknown_zip")
+                listings.append(listing)
+        kept.append({**entry, "listings": listings} if "listings" in entry else entry)
+    return kept
+
+
+def _sort_by_distance(results, distances):
+    """
+    Order cleaned listings nearest first, tagging each with distanceMiles.
+    Listings of unknown distance keep their order at the end, with distanceMiles None.
+    """
+    located, unlocated = [], []
+    for vin, record in results.items():
+        distance = distances.get(normalize_zip(record["retailListing"].get("zip")))
+        record["retailListing"]["distanceMiles"] = round(distance, 1) if distance is not None else None
+        (located if distance is not None else unlocated).append((vin, record))
+    located.sort(key=lambda item: item[1]["retailListing"]["distanceMiles"])
+    return dict(located + unlocated)
+
+
+async def _fetch_listings(plan, states, budget, headers, page=1):
+    """Run the planned Auto.dev queries for every state concurrently and merge the results."""
+    per_state = await asyncio.gather(
+        *(fetch_all_listings_async(plan, state, budget, headers, page=page) for state in states)
+    )
+    car_listings = [entry for entries, _ in per_state for entry in entries]
+    has_more = any(more for _, more in per_state)
+    return car_listings, has_more
+
+
+def _cache_entry(payload, has_more=None):
+    """Packed payload plus its content ETag, as held by listings_cache and search sessions."""
+    content = {key: value for key, value in payload.items() if key not in SESSION_FIELDS}
+    return {"payload": pack_payload(payload), "etag": compute_etag(content), "hasMore": has_more}
+
+
+def _serve_cached(entry):
+    """Answer a conditional GET from a cache entry, unpacking only when the body is needed."""
+    response = not_modified(entry["etag"], max_age=LISTINGS_CACHE_TTL) or conditional_json(
+        unpack_payload(entry["payload"]), etag=entry["etag"], max_age=LISTINGS_CACHE_TTL, keep_order=True
+    )
+    response.headers["X-Cache"] = "hit"
+    # The ETag ignores the cursor, so a 304 still hands out the live session
+    response.headers["X-Search-Cursor"] = entry["payload"]["cursor"]
+    return response
+
+
+def _with_live_session(entry):
+    """
+    A cached first page is only served while its search session is open:
+    its cursor would 410 on the next page otherwise. A closed one is a miss.
+    """
+    if entry is None:
+        return None
+    if search_sessions.get(entry["payload"]["cursor"]) is None:
+        metrics.increment("listings.cache.session_expired")
+        return None
+    return entry
+
+
+def _serve_fresh(payload, etag):
+    # Listings keep their order (radius searches are sorted nearest first)
+    response = conditional_json(payload, etag=etag, max_age=LISTINGS_CACHE_TTL, keep_order=True)
+    response.headers["X-Cache"] = "miss"
+    response.headers["X-Search-Cursor"] = payload["cursor"]
+    return response
+
+
+def _build_page(car_listings, seen_vins, radius_search=None, facets=None):
+    """
+    Clean, dedupe and summarize one page of Auto.dev results.
+
+    ``seen_vins`` holds VINs already returned on earlier pages; it is updated in place.
+    ``radius_search`` is an optional {"zip", "radiusMiles"} that filters and sorts by distance.
+    ``facets`` holds the filter metadata of earlier pages. It is left untouched: the
+    page is merged into a copy, so the payload's "filters" cover every page so far.
+
+    Returns:
+        tuple: (payload, facets through this page), to be stored with the page
+    """
+    distances = None
+    if radius_search:
+        distances = {
+            zip_code: distance
+            for zip_code, distance, _ in zips_within(radius_search["zip"], radius_search["radiusMiles"])
+        }
+        car_listings = _within_radius(car_listings, distances)
+
+    page_facets = FacetAccumulator()
+    try:
+        simplified = clean_listings({"results": car_listings}, seen_vins=seen_vins, facets=page_facets)
+        if distances is not None:
+            simplified["results"] = _sort_by_distance(simplified["results"], distances)
+        print(f"✅ Found {simplified['uniqueVinCount']} unique VINs")
+    except Exception as e:
+        print(f"⚠️ Failed to clean listings: {e}")
+        import traceback
+        traceback.print_exc()
+        simplified = {"uniqueVinCount": 0, "results": {}}
+        page_facets = FacetAccumulator()
+
+    for vin, record in simplified["results"].items():
+        listing_store.set(vin, record)
+
+    # Concurrent fetches of the same page share the session's accumulator; never merge into it
+    if facets is not None:
+        page_facets = FacetAccumulator().merge(facets).merge(page_facets)
+    filters = page_facets.to_filters()
+    print(f"✅ Generated filters with {len(filters['makes'])} makes")
+
+    return {
+        "items": simplified["uniqueVinCount"],
+        "listings": simplified["results"],
+        "filters": filters
+    }, page_facets
+
+
+async def _get_listings_page(cursor, page):
+    """Serve page ``page`` (default: the next unfetched one) of an open search session."""
+    session = search_sessions.get(cursor)
+    if session is None:
+        return jsonify({"error": "Search session expired, start a new search"}), 410
+
+    pages = session["pages"]
+    page = page or max(pages) + 1
+    if page < 1:
+        return jsonify({"error": "page must be >= 1"}), 400
+
+    if page not in pages:
+        if page - 1 not in pages:
+            return jsonify({"error": f"Fetch page {max(pages) + 1} first"}), 400
+        if not pages[page - 1]["hasMore"]:
+            return jsonify({"error": "No more results"}), 404
+
+        headers = get_auto_dev_headers()
+        if not headers:
+            return jsonify({"error": "Missing AUTO_DEV_KEY environment variable"}), 500
+
+        # Incremental dedupe: only VINs not returned on any earlier page survive.
+        # Both are taken before the fetch, which other requests may finish first.
+        seen_vins = set().union(*(vins for n, vins in session["vins"].items() if n < page))
+        facets = session["facets"]
+        car_listings, has_more = await _fetch_listings(
+            session["plan"], session["states"], session["budget"], headers, page=page
+        )
+
+        # A concurrent fetch of this page already stored it (and its facets): serve that one
+        latest = search_sessions.get(cursor)
+        if latest is not None and page in latest["pages"]:
+            return _serve_cached(latest["pages"][page])
+
+        payload, facets = _build_page(
+            car_listings, seen_vins=seen_vins, radius_search=session["radiusSearch"], facets=facets
+        )
+        payload.update({"page": page, "cursor": cursor, "hasMore": has_more})
+        pages[page] = _cache_entry(payload, has_more)
+        session["vins"][page] = set(payload["listings"])
+        session["facets"] = facets
+        # Write back so workers sharing the session backend see the new page
+        search_sessions.set(cursor, session)
+        metrics.increment("listings.pages_fetched")
+        return _serve_fresh(payload, pages[page]["etag"])
+
+    return _serve_cached(pages[page])
+
+
 @listings_bp.route("/", methods=["GET"])
-def get_listings_by_filter():
-    """Fetch real car listings from Auto.dev based on AI-generated or user-provided criteria."""
+async def get_listings_by_filter():
+    """
+    Fetch real car listings from Auto.dev based on AI-generated or user-provided criteria.
+
+    The first page opens a search session; pass its ``cursor`` (and optionally
+    ``page``) to pull further Auto.dev pages for the same recommendations.
+    """
     try:
+        cursor = request.args.get("cursor")
+        if cursor:
+            return await _get_listings_page(cursor, request.args.get("page", type=int))
+
         state = request.args.get("state")
-        if not state:
-            return jsonify({"error": "state is required"}), 400
+        zip_code = request.args.get("zip")
+        radius_search = None
+        if zip_code:
+            # Radius mode: cover every state within radius_miles of the ZIP
+            origin = lookup_zip(zip_code)
+            if origin is None:
+                return jsonify({"error": f"Unknown zip: {zip_code}"}), 400
+            radius = request.args.get("radius_miles", default=DEFAULT_RADIUS_MILES, type=float)
+            radius = max(0.0, min(radius, MAX_RADIUS_MILES))
+            radius_search = {"zip": normalize_zip(zip_code), "radiusMiles": radius}
+            state = state or origin[2]
+            states = states_within(zip_code, radius) or [origin[2]]
+            print(f"📍 Radius search: {radius:g} miles around {zip_code} covers {states}")
+        elif not state:
+            return jsonify({"error": "state or zip is required"}), 400
+        else:
+            states = [state]
 
         make = request.args.get("make")
         model = request.args.get("model")
@@ -25,119 +303,74 @@ def get_listings_by_filter():
         if not (make or model) and not primary_use:
             return jsonify({"error": "primary_use is required"}), 400
         budget = request.args.get("budget")
+        try:
+            parse_budget(budget)
+        except ValueError:
+            return jsonify({"error": "budget must be a positive number"}), 400
 
-        car_listings = []
+        # --- 0️⃣ Serve repeat searches (and their revalidations) from the result cache ---
+        cache_key = tuple(sorted(request.args.items(multi=True)))
+        cached = _with_live_session(listings_cache.get(cache_key))
+        if cached is not None:
+            print(f"♻️ Serving cached listings for {dict(cache_key)}")
+            return _serve_cached(cached)
 
-        # --- 1️⃣ Get recommendations ---
-        if make and model:
-            # ✅ User directly provided make/model → single query, no AI
-            recommendations = [{
-                "make": make,
-                "model": model,
-                "year": model_year,
-            }]
-            print(f"ℹ️ Direct search: {make} {model} ({model_year or 'any year'})")
+        # Concurrent identical searches (on any worker) wait for one build instead of stampeding
+        async with listings_cache.single_flight(cache_key) as cached:
+            cached = _with_live_session(cached)
+            if cached is not None:
+                print(f"♻️ Serving listings built meanwhile for {dict(cache_key)}")
+                return _serve_cached(cached)
 
-        else:
-            # ✅ Use AI to generate recommendations
-            try:
-                rec_response = get_car_recommendation(state, budget, primary_use, comfort)
-                # Handle both tuple (error) and Response object cases
-                if isinstance(rec_response, tuple):
-                    # Error case: (response, status_code)
-                    error_data = rec_response[0].get_json()
-                    return jsonify({"error": error_data.get("error", "AI recommendation error")}), rec_response[1]
-                recommendations_json = rec_response.get_json()
-            except Exception as e:
-                print(f"❌ Failed to get AI recommendations: {e}")
-                return jsonify({"error": f"AI recommendation error: {str(e)}"}), 500
-
-            # --- Parse AI output safely ---
-            try:
-                raw_text = recommendations_json.get("recommendations", {}).get("text", "")
-                raw_text = raw_text.replace("```json", "").replace("```", "").strip()
-                recommendations = json.loads(raw_text)
-                print(recommendations)
-                print(f"✅ AI provided {len(recommendations)} car suggestions")
-            except Exception as e:
-                print(f"❌ Failed to parse AI recommendations: {e}")
-                return jsonify({"error": f"Failed to parse AI output: {str(e)}"}), 500
+            # Only the build takes a search slot: admitted behind interactive requests,
+            # or shed when the worker is saturated
+            shed = await admission.admit("search")
+            if shed is not None:
+                return shed
 
-        # --- 2️⃣ Validate Auto.dev token ---
-        token = os.getenv("AUTO_DEV_KEY")
-        if not token:
-            return jsonify({"error": "Missing AUTO_DEV_KEY environment variable"}), 500
+            # --- 1️⃣ Get recommendations ---
+            if make and model:
+                # ✅ User directly provided make/model → single query, no AI
+                recommendations = [{
+                    "make": make,
+                    "model": model,
+                    "year": model_year,
+                }]
+                print(f"ℹ️ Direct search: {make} {model} ({model_year or 'any year'})")
 
-        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+            else:
+                # ✅ Use AI to generate recommendations, hedged by the local catalog ranking
+                recommendations = await _hedged_recommendations(state, budget, primary_use, comfort)
 
-        # --- 3️⃣ Call Auto.dev for each recommended vehicle ---
-        for rec in recommendations:
-            make = rec.get("make")
-            model = rec.get("model")
-            year = rec.get("year")
+            # --- 2️⃣ Validate Auto.dev token ---
+            headers = get_auto_dev_headers()
+            if not headers:
+                return jsonify({"error": "Missing AUTO_DEV_KEY environment variable"}), 500
 
-            if not (make and model):
-                print(f"⚠️ Skipping incomplete recommendation: {rec}")
-                continue
+            # --- 3️⃣ Plan merged Auto.dev queries once, then run them for every state concurrently ---
+            plan = plan_queries(recommendations)
+            car_listings, has_more = await _fetch_listings(plan, states, budget, headers)
 
-            url = (
-                f"https://api.auto.dev/listings?"
-                f"vehicle.make={make}&"
-                f"vehicle.model={model}&"
-                f"retailListing.state={state}&"
-                f"limit=5"
-            )
+            # --- 4️⃣ Clean, score and build filters for the first page ---
+            payload, facets = _build_page(car_listings, seen_vins=set(), radius_search=radius_search)
 
-            if budget:
-                url += f"&retailListing.price=0-{budget}"
-            if year:
-                url += f"&vehicle.year={year}"
-
-            try:
-                resp = requests.get(url, headers=headers, timeout=10)
-                if resp.status_code == 200:
-                    listings_data = resp.json()
-                    car_listings.append({
-                        "recommendation": rec,
-                        "listings": listings_data.get("listings", listings_data.get("data", []))
-                    })
-                else:
-                    print(f"❌ Auto.dev error {resp.status_code} for {make} {model}")
-                    car_listings.append({
-                        "recommendation": rec,
-                        "error": f"Auto.dev returned {resp.status_code}"
-                    })
-            except Exception as e:
-                print(f"❌ Request failed for {make} {model}: {e}")
-                car_listings.append({
-                    "recommendation": rec,
-                    "error": f"Request exception: {str(e)}"
-                })
-
-        # --- 4️⃣ Clean + deduplicate listings ---
-        try:
-            simplified = clean_listings({"results": car_listings})
-            print(f"✅ Found {simplified['uniqueVinCount']} unique VINs")
-        except Exception as e:
-            print(f"⚠️ Failed to clean listings: {e}")
-            import traceback
-            traceback.print_exc()
-            simplified = {"uniqueVinCount": 0, "results": {}}
-
-        # --- 5️⃣ Generate filters ---
-        try:
-            filters = get_filter_data(simplified.get("results", {}))
-            print(f"✅ Generated filters with {len(filters.get('makes', []))} makes")
-        except Exception as e:
-            print(f"⚠️ Failed to generate filters: {e}")
-            filters = {}
-
-        # --- 6️⃣ Return structured response ---
-        return jsonify({
-            "items": simplified["uniqueVinCount"],
-            "listings": simplified["results"],
-            "filters": filters
-        }), 200
+            # --- 5️⃣ Open a search session so later pages can be pulled on demand ---
+            cursor = secrets.token_urlsafe(12)
+            payload.update({"page": 1, "cursor": cursor, "hasMore": has_more})
+            entry = _cache_entry(payload, has_more)
+            search_sessions.set(cursor, {
+                "states": states,
+                "radiusSearch": radius_search,
+                "budget": budget,
+                "plan": plan,
+                "pages": {1: entry},
+                "vins": {1: set(payload["listings"])},
+                "facets": facets,
+            })
+
+            # --- 6️⃣ Return structured response ---
+            listings_cache.set(cache_key, entry)
+            return _serve_fresh(payload, entry["etag"])
     except Exception as e:
         import traceback
         error_msg = str(e)
@@ -145,11 +378,90 @@ def get_listings_by_filter():
         print(f"❌ Unhandled error in get_listings_by_filter: {error_msg}")
         return jsonify({"error": f"Internal server error: {error_msg}"}), 500
 
+@listings_bp.route("/<vin>/ratings", methods=["GET"])
+async def get_listing_ratings(vin):
+    """Enrich a listing's local deal/value scores with LLM ratings (fuel economy, safety, ...), on demand."""
+    try:
+        record = listing_store.get(vin)
+        if record is None:
+            return jsonify({"error": f"Unknown or expired VIN: {vin}"}), 404
+
+        async with ratings_cache.single_flight(vin) as llm_ratings:
+            if llm_ratings is None:
+                llm_ratings = await get_car_rating_async(record)
+                if "error" in llm_ratings:
+                    # Fall back to local scores only
+                    print(f"⚠️ Failed to get LLM rating for {vin}: {llm_ratings['error']}")
+                    llm_ratings = {}
+                else:
+                    ratings_cache.set(vin, llm_ratings)
+
+        ratings = merge_llm_ratings(record.get("ratings", {}), llm_ratings)
+        return conditional_json({"vin": vin, "ratings": ratings}, max_age=LISTINGS_CACHE_TTL)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+async def _resolve_photos(vins):
+    """
+    Photo galleries for VINs from the photo cache, fetching misses from Auto.dev.
+    Empty galleries are cached too (for PHOTO_MISS_TTL) so photo-less VINs
+    don't hit Auto.dev on every open; failed calls are not cached.
+    """
+    galleries = {vin: photo_cache.get(vin) for vin in vins}
+    missing = [vin for vin, images in galleries.items() if images is None]
+    headers = get_auto_dev_headers()
+    if missing and headers:
+        fetched = await fetch_all_photos_async(missing, headers)
+        for vin, images in fetched.items():
+            if images is not None:
+                photo_cache.set(vin, images, ttl=None if images else PHOTO_MISS_TTL)
+                galleries[vin] = images
+    metrics.increment("photos.cache_hits", len(vins) - len(missing))
+    metrics.increment("photos.upstream_calls", len(missing) if headers else 0)
+
+    for vin, images in galleries.items():
+        if not images:
+            # Fall back to the primary image from the search results
+            record = listing_store.get(vin) or {}
+            primary = record.get("retailListing", {}).get("images")
+            galleries[vin] = [primary] if isinstance(primary, str) else (primary or [])
+    return galleries
+
+@listings_bp.route("/<vin>/photos", methods=["GET"])
+async def get_listing_photos(vin):
+    """Resolve the full photo gallery for one listing."""
+    try:
+        galleries = await _resolve_photos([vin])
+        return conditional_json({"vin": vin, "images": galleries[vin]}, max_age=PHOTO_CACHE_TTL)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+@listings_bp.route("/photos", methods=["GET"])
+async def get_listings_photos():
+    """Resolve photo galleries for a comma-separated ?vins= list."""
+    try:
+        vins = [vin.strip() for vin in request.args.get("vins", "").split(",") if vin.strip()]
+        if not vins:
+            return jsonify({"error": "vins is required"}), 400
+        if len(vins) > MAX_PHOTO_BATCH:
+            return jsonify({"error": f"at most {MAX_PHOTO_BATCH} vins per request"}), 400
+
+        galleries = await _resolve_photos(list(dict.fromkeys(vins)))
+        return conditional_json({"photos": galleries}, max_age=PHOTO_CACHE_TTL)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
 @listings_bp.route("/chat", methods=["POST"])
-def chat_with_ai():
+async def chat_with_ai():
     """Chat with AI about a specific car."""
     try:
-        data = request.get_json()
+        data = await request.get_json()
         car_data = data.get("car")
         message_history = data.get("messageHistory", [])
         user_message = data.get("message", "")
@@ -160,22 +472,48 @@ def chat_with_ai():
         if not user_message:
             return jsonify({"error": "Message is required"}), 400
 
+        # Known VINs are described from the server's copy of the listing, not the posted car
+        vin = car_data.get("vin")
+        record = listing_store.get(vin) if vin else None
+        if record is not None:
+            car_data = car_from_record(vin, record, ratings_cache.get(vin))
+
+        # First turn: no assistant reply yet (the client may already include this message).
+        # Only server-side cars share answers across users.
+        first_turn = not any(msg.get("role") == "assistant" for msg in message_history)
+        cacheable = first_turn and record is not None
+
         # Add user message to history
         message_history.append({"role": "user", "content": user_message})
 
+        # Common first-turn questions about this VIN are answered from the cache
+        reply = lookup_answer(car_data, user_message) if cacheable else None
+        if reply is not None:
+            metrics.increment("chat.answer_cache.hits")
+            message_history.append({"role": "assistant", "content": reply})
+            response = jsonify({"reply": reply, "messageHistory": message_history})
+            response.headers["X-Cache"] = "hit"
+            return response, 200
+
         # Get AI response
-        result = chat_about_car(car_data, message_history)
+        result = await chat_about_car_async(car_data, message_history)
         
         if "error" in result:
             return jsonify(result), 500
 
+        if cacheable:
+            metrics.increment("chat.answer_cache.misses")
+            store_answer(car_data, user_message, result["reply"])
+
         # Add AI response to history
         message_history.append({"role": "assistant", "content": result["reply"]})
 
-        return jsonify({
+        response = jsonify({
             "reply": result["reply"],
             "messageHistory": message_history
-        }), 200
+        })
+        response.headers["X-Cache"] = "miss"
+        return response, 200
 
     except Exception as e:
         import traceback
@@ -1,77 +1,49 @@
-from flask import Blueprint, jsonify
-import requests
-import os
-from openai import OpenAI
+from quart import Blueprint, jsonify, request
+from ..utils.recommendation_matrix import DEFAULT_RECOMMENDATIONS, MATRIX_CELL_SIZE, lookup_recommendations, cell_key
+from ..utils.local_recommendations import parse_budget, recommend_local
+from ..utils.http_cache import conditional_json
+from ..utils import metrics
 
 recommendations_bp = Blueprint("recommendations", __name__)
 
 @recommendations_bp.route("/", methods=["GET"])
-def get_car_recommendations():
-    key = os.getenv("OPENAI_API_KEY")
-    if not key:
-        return jsonify({"error": "Missing OpenAI API key"}), 500
-
-    client = OpenAI(api_key=key)
-
-    # Extract query parameters
-    #budget = request.args.get("budget", "")
-    #car_type = request.args.get("type", "")
-    #location = request.args.get("location", "")
-    #primary_use = request.args.get("use", "")
-
-    budget = 10000
-    car_type = "SUV"
-    location = "San Francisco, CA"
-    primary_use = "Daily commuting and weekend trips"
-
-    # Validate
-    if not budget or not car_type or not location or not primary_use:
-        return jsonify({"error": "Missing one or more required query parameters"}), 400
-
-    # Construct a prompt for OpenAI
-    prompt = f"""
-    You are an expert car consultant. Suggest 10 cars (make, model, and year) that best fit
-    the following buyer preferences:
-
-    - Max budget: ${budget}
-    - Car type: {car_type}
-    - Location: {location}
-    - Primary use: {primary_use}
-
-    Each recommendation should include:
-    1. Make
-    2. Model
-    3. Year (within budget range)
-    4. Estimated price based on current market trends
-
-    Respond in JSON format as a list of objects with keys:
-    ["make", "model", "year", "price"].
-    """
-
+async def get_car_recommendations():
+    """Recommend cars for a buyer from the precomputed recommendation matrix, or rank them live."""
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a helpful car buying assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
-        )
+        state = request.args.get("state")
+        if not state:
+            return jsonify({"error": "state is required"}), 400
 
-        raw = response.choices[0].message.content.strip()
-
-        # Try to parse the response into JSON
-        import json
+        budget = request.args.get("budget")
         try:
-            recommendations = json.loads(raw)
-        except json.JSONDecodeError:
-            # If parsing fails, wrap raw text
-            recommendations = {"text": raw}
-
-        return jsonify({
-            "recommendations": recommendations
-        })
-
+            parse_budget(budget)
+        except ValueError:
+            return jsonify({"error": "budget must be a positive number"}), 400
+        primary_use = request.args.get("primary_use") or request.args.get("use")
+        comfort = request.args.get("comfort") or request.args.get("type")
+        try:
+            limit = int(request.args.get("limit", DEFAULT_RECOMMENDATIONS))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MATRIX_CELL_SIZE:
+            return jsonify({"error": f"limit must be an integer from 1 to {MATRIX_CELL_SIZE}"}), 400
+
+        recommendations = lookup_recommendations(state, budget, primary_use, comfort, limit=limit)
+        if recommendations is not None:
+            source = "matrix"
+            metrics.increment("recommendations.matrix.hit")
+        else:
+            # No matrix built, unknown state, sub-minimum budget or a limit past the cell size → rank live
+            source = "local"
+            metrics.increment("recommendations.matrix.miss")
+            recommendations = recommend_local(state, budget, primary_use, comfort, limit=limit)
+
+        return conditional_json({
+            "recommendations": recommendations,
+            "cell": cell_key(state, budget, primary_use, comfort),
+            "source": source,
+        }, max_age=3600)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
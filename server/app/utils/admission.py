@@ -0,0 +1,164 @@
+"""
+Admission Control
+=================
+Per-worker concurrency limits and queue-time budgets per route class, so a
+burst of slow searches can't take every slot while cheap requests wait.
+
+    search       cold /listings/ searches: upstream fan-out + cleaning
+    interactive  chat, ratings, photos, cursor pages and /recommendations/
+    (exempt)     /, /healthz, /metrics, CORS preflights and unknown routes
+
+Interactive requests are gated before the view runs. Searches are gated by
+the view itself (``admit("search")``) after its cache lookup, so repeat
+searches and If-None-Match revalidations answered from the cache are never
+queued or shed.
+
+Interactive requests have priority: while any are queued, no search is
+admitted. A request that can't get a slot within its class' queue budget,
+or arrives to a full queue, gets an immediate 503 with ``Retry-After``.
+Set ADMISSION_CONTROL=0 to disable.
+
+Every request of a worker runs on its one event loop, so a queued request
+is just a suspended coroutine: the limits bound upstream fan-out and CPU
+per worker, not threads.
+"""
+
+import asyncio
+import math
+import os
+import time
+
+from quart import g, jsonify, request
+
+from . import metrics
+
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "1") != "0"
+
+# Total in-flight requests per worker, across classes. Searches mostly await
+# upstream I/O on the shared event loop, so a worker carries hundreds.
+MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "512"))
+
+# class -> (max in flight, max queued, queue-time budget in seconds)
+ROUTE_CLASSES = {
+    "search": (
+        int(os.getenv("ADMISSION_SEARCH_CONCURRENCY", "256")),
+        int(os.getenv("ADMISSION_SEARCH_QUEUE", "256")),
+        float(os.getenv("ADMISSION_SEARCH_QUEUE_SECONDS", "1.0")),
+    ),
+    "interactive": (
+        int(os.getenv("ADMISSION_INTERACTIVE_CONCURRENCY", "256")),
+        int(os.getenv("ADMISSION_INTERACTIVE_QUEUE", "512")),
+        float(os.getenv("ADMISSION_INTERACTIVE_QUEUE_SECONDS", "3.0")),
+    ),
+}
+
+SEARCH_ENDPOINT = "listings.get_listings_by_filter"
+ADMITTED_BLUEPRINTS = ("listings.", "recommendations.")
+
+
+class AdmissionController:
+    """Counting gate with per-class limits and strict priority for interactive requests."""
+
+    def __init__(self, classes, max_in_flight):
+        self.classes = classes
+        self.max_in_flight = max_in_flight
+        self.in_flight = {name: 0 for name in classes}
+        self.waiting = {name: 0 for name in classes}
+        self._cond = asyncio.Condition()
+
+    def _can_admit(self, route_class):
+        if self.in_flight[route_class] >= self.classes[route_class][0]:
+            return False
+        if sum(self.in_flight.values()) >= self.max_in_flight:
+            return False
+        return route_class == "interactive" or self.waiting["interactive"] == 0
+
+    async def acquire(self, route_class):
+        """
+        Wait up to the class' queue budget for a slot.
+
+        Returns:
+            bool: True once admitted (call ``release``), False when shed
+        """
+        _, max_queued, budget = self.classes[route_class]
+        async with self._cond:
+            if self._can_admit(route_class):
+                self.in_flight[route_class] += 1
+                return True
+            if self.waiting[route_class] >= max_queued:
+                return False
+
+            self.waiting[route_class] += 1
+            try:
+                await asyncio.wait_for(self._cond.wait_for(lambda: self._can_admit(route_class)), budget)
+                self.in_flight[route_class] += 1
+                return True
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                self.waiting[route_class] -= 1
+                # A shed interactive request may unblock searches
+                self._cond.notify_all()
+
+    async def release(self, route_class):
+        async with self._cond:
+            self.in_flight[route_class] -= 1
+            self._cond.notify_all()
+
+    def snapshot(self):
+        return {"inFlight": dict(self.in_flight), "waiting": dict(self.waiting)}
+
+
+controller = AdmissionController(ROUTE_CLASSES, MAX_IN_FLIGHT)
+
+
+def route_class():
+    """
+    Class the current request is gated under before its view runs, or None when
+    it's exempt or (cold searches) gated by the view after its cache lookup.
+    """
+    endpoint = request.endpoint or ""
+    if request.method == "OPTIONS" or not endpoint.startswith(ADMITTED_BLUEPRINTS):
+        return None
+    if endpoint == SEARCH_ENDPOINT and not request.args.get("cursor"):
+        return None
+    return "interactive"
+
+
+async def admit(name):
+    """
+    Admit the current request under class ``name`` (released at teardown).
+
+    Returns:
+        Response | None: a 503 to return when the request is shed, else None
+    """
+    if not ADMISSION_CONTROL or "admission_class" in g:
+        return None
+    started = time.monotonic()
+    if not await controller.acquire(name):
+        metrics.increment(f"admission.{name}.shed")
+        response = jsonify({"error": "Server is busy, please retry shortly"})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(math.ceil(controller.classes[name][2]) or 1)
+        return response
+    g.admission_class = name
+    metrics.increment(f"admission.{name}.admitted")
+    metrics.increment(f"admission.{name}.queued_ms", int((time.monotonic() - started) * 1000))
+    return None
+
+
+def init_app(app):
+    """Gate interactive requests before their view; the search view calls ``admit`` itself."""
+    if not ADMISSION_CONTROL:
+        return
+
+    @app.before_request
+    async def admit_interactive():
+        name = route_class()
+        return await admit(name) if name is not None else None
+
+    @app.teardown_request
+    async def release(_exc):
+        name = g.pop("admission_class", None)
+        if name is not None:
+            await controller.release(name)
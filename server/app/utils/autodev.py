@@ -0,0 +1,149 @@
+"""
+Auto.dev client
+===============
+URL building and async (httpx) fetchers for the Auto.dev listings API.
+httpx is imported on first use so it stays off the cold-start path.
+
+Every request of a worker shares one event loop, so they also share one
+httpx.AsyncClient (connection pool and TLS context) instead of paying for
+a new one per search.
+"""
+
+import os
+
+from .query_planner import spread_results
+
+# Overridable so load tests can point at local stubs (see replay_traffic.py)
+AUTO_DEV_BASE_URL = os.getenv("AUTO_DEV_BASE_URL", "https://api.auto.dev")
+AUTO_DEV_TIMEOUT = 10
+# Pooled upstream connections per worker
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "500"))
+
+_client = None
+_client_loop = None
+
+
+def get_auto_dev_headers():
+    """Return request headers for Auto.dev, or None when AUTO_DEV_KEY is missing."""
+    token = os.getenv("AUTO_DEV_KEY")
+    if not token:
+        return None
+    return {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+
+
+def get_http_client():
+    """The worker's shared httpx.AsyncClient, created on first use in the running event loop."""
+    global _client, _client_loop
+    import asyncio
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(limits=httpx.Limits(
+            max_connections=UPSTREAM_MAX_CONNECTIONS, max_keepalive_connections=UPSTREAM_MAX_CONNECTIONS
+        ))
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client():
+    """Close the shared client at worker shutdown."""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+        _client, _client_loop = None, None
+
+
+def build_listings_url(make, model, state, budget=None, year=None, limit=5, page=None):
+    url = (
+        f"{AUTO_DEV_BASE_URL}/listings?"
+        f"vehicle.make={make}&"
+        f"vehicle.model={model}&"
+        f"retailListing.state={state}&"
+        f"limit={limit}"
+    )
+    if budget:
+        url += f"&retailListing.price=0-{budget}"
+    if year:
+        url += f"&vehicle.year={year}"
+    if page and page > 1:
+        url += f"&page={page}"
+    return url
+
+
+def _listings_result(query, status_code, body):
+    """Shape one Auto.dev response into a {listings|error} entry for the planner."""
+    if status_code == 200:
+        return {"listings": body.get("listings", body.get("data", []))}
+    print(f"❌ Auto.dev error {status_code} for {query.get('make')} {query.get('model')}")
+    return {"error": f"Auto.dev returned {status_code}"}
+
+
+async def fetch_listings_async(client, query, state, budget, headers):
+    """Fetch listings for one planned query on a shared httpx.AsyncClient."""
+    url = build_listings_url(
+        query["make"], query["model"], state, budget, query.get("year"), query.get("limit", 5), query.get("page")
+    )
+    try:
+        resp = await client.get(url, headers=headers, timeout=AUTO_DEV_TIMEOUT)
+        return _listings_result(query, resp.status_code, resp.json() if resp.status_code == 200 else {})
+    except Exception as e:
+        print(f"❌ Request failed for {query.get('make')} {query.get('model')}: {e}")
+        return {"error": f"Request exception: {str(e)}"}
+
+
+async def fetch_all_listings_async(plan, state, budget, headers, page=1):
+    """
+    Run planned Auto.dev queries (see query_planner.plan_queries) concurrently.
+
+    Args:
+        plan (list): queries from plan_queries; not modified, so one plan can
+                     serve every state and page of a search
+        page (int): Auto.dev results page to fetch for every planned query
+
+    Returns:
+        tuple: ({"recommendation", "listings" | "error"} entries, one per distinct
+               recommendation, as clean_listings expects; whether any query
+               returned a full page, i.e. more results may follow)
+    """
+    import asyncio
+
+    client = get_http_client()
+    responses = await asyncio.gather(
+        *(fetch_listings_async(client, {**query, "page": page}, state, budget, headers) for query in plan)
+    )
+    has_more = any(
+        len(response.get("listings", [])) >= query["limit"] for query, response in zip(plan, responses)
+    )
+    return spread_results(plan, responses), has_more
+
+
+async def fetch_photos_async(client, vin, headers):
+    """
+    Fetch the retail photo gallery for one VIN.
+
+    Returns:
+        list | None: image URLs ([] when Auto.dev has no gallery for the VIN),
+                     or None when the call failed
+    """
+    try:
+        resp = await client.get(f"{AUTO_DEV_BASE_URL}/photos/{vin}", headers=headers, timeout=AUTO_DEV_TIMEOUT)
+        if resp.status_code == 404:
+            return []
+        if resp.status_code != 200:
+            print(f"❌ Auto.dev error {resp.status_code} for {vin} images")
+            return None
+        photo_data = resp.json().get("data") or {}
+        return photo_data.get("retail") or []
+    except Exception as e:
+        print(f"❌ Auto.dev error for {vin} images: {e}")
+        return None
+
+
+async def fetch_all_photos_async(vins, headers):
+    """Fetch galleries for several VINs concurrently; returns {vin: images | [] | None}."""
+    import asyncio
+
+    client = get_http_client()
+    galleries = await asyncio.gather(*(fetch_photos_async(client, vin, headers) for vin in vins))
+    return dict(zip(vins, galleries))
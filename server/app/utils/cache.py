@@ -0,0 +1,193 @@
+"""
+In-process result caches
+========================
+Small thread-safe TTL cache used to keep recently built responses around so
+repeat searches (and conditional GETs against them) skip the upstream work.
+Caches created with ``compact=True`` hold listing records in the packed form
+from records.py and rebuild the dict on every get.
+
+Every cache shares one interface, so the backend is picked per deployment
+with CACHE_BACKEND:
+    memory  per-process TTL/LRU (default)
+    sqlite  one WAL-mode SQLite file shared by every worker on the host
+    redis   any Redis-protocol server shared by the whole fleet (REDIS_URL)
+See cache_backends.py for the shared backends.
+"""
+
+import asyncio
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+from .records import pack, unpack
+from . import metrics
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+
+# How long one worker may hold a recompute lock, and how often waiters re-check
+RECOMPUTE_LOCK_TIMEOUT = float(os.getenv("RECOMPUTE_LOCK_TIMEOUT", "30"))
+LOCK_POLL_INTERVAL = 0.05
+
+
+class Cache:
+    """
+    Cache interface: get/set/delete/clear plus recompute locks.
+
+    Backends implement ``_load``/``_store(key, value, ttl)``/``delete``/``clear``/``__len__``
+    and ``try_lock``/``release_lock``; packing and single-flight recompute
+    live here.
+    """
+
+    def __init__(self, ttl, max_entries=256, compact=False, name="cache"):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.compact = compact
+        self.name = name
+
+    def get(self, key):
+        value = self._load(key)
+        if value is None:
+            return None
+        return unpack(value) if self.compact else value
+
+    def set(self, key, value, ttl=None):
+        """Store ``value``; ``ttl`` overrides the cache's default lifetime for this entry."""
+        self._store(key, pack(value) if self.compact else value, self.ttl if ttl is None else ttl)
+
+    @asynccontextmanager
+    async def single_flight(self, key, timeout=RECOMPUTE_LOCK_TIMEOUT):
+        """
+        Stampede guard around an expensive recompute.
+
+        Yields the cached value, or None when the caller should compute and
+        ``set`` it. Only one caller (across every worker sharing the backend)
+        recomputes a key at a time; the others wait for its result and only
+        recompute themselves if the lock holder gives up.
+
+            async with cache.single_flight(key) as value:
+                if value is None:
+                    value = await compute()
+                    cache.set(key, value)
+        """
+        value = self.get(key)
+        if value is not None:
+            yield value
+            return
+
+        token = self.try_lock(key, timeout)
+        deadline = time.monotonic() + timeout
+        while token is None and time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            value = self.get(key)
+            if value is not None:
+                metrics.increment(f"cache.{self.name}.stampede_waits")
+                yield value
+                return
+            token = self.try_lock(key, timeout)
+
+        try:
+            yield None
+        finally:
+            if token is not None:
+                self.release_lock(key, token)
+
+
+class TTLCache(Cache):
+    """Bounded LRU cache whose entries expire ``ttl`` seconds after being set."""
+
+    def __init__(self, ttl, max_entries=256, compact=False, name="cache"):
+        super().__init__(ttl, max_entries, compact, name)
+        self._data = OrderedDict()
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _load(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def _store(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def try_lock(self, key, timeout):
+        with self._lock:
+            held = self._locks.get(key)
+            if held is not None and held[1] > time.monotonic():
+                return None
+            token = secrets.token_hex(8)
+            self._locks[key] = (token, time.monotonic() + timeout)
+            return token
+
+    def release_lock(self, key, token):
+        with self._lock:
+            if self._locks.get(key, (None,))[0] == token:
+                del self._locks[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._locks.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def make_cache(name, ttl, max_entries=256, compact=False):
+    """Create a cache on the configured CACHE_BACKEND, namespaced by ``name``."""
+    if CACHE_BACKEND == "sqlite":
+        from .cache_backends import SQLiteCache
+        return SQLiteCache(ttl, max_entries, compact, name)
+    if CACHE_BACKEND == "redis":
+        from .cache_backends import RedisCache
+        return RedisCache(ttl, max_entries, compact, name)
+    return TTLCache(ttl, max_entries, compact, name)
+
+
+# Built /listings/ payloads keyed by the normalized query string
+LISTINGS_CACHE_TTL = int(os.getenv("LISTINGS_CACHE_TTL", "300"))
+listings_cache = make_cache("listings", ttl=LISTINGS_CACHE_TTL)
+
+# Cleaned listing records keyed by VIN, for detail endpoints
+LISTING_STORE_TTL = int(os.getenv("LISTING_STORE_TTL", "3600"))
+listing_store = make_cache("listing_store", ttl=LISTING_STORE_TTL, max_entries=5000, compact=True)
+
+# LLM recommendations keyed by recommendation-matrix cell, for cells the matrix lacks
+RECOMMENDATIONS_CACHE_TTL = int(os.getenv("RECOMMENDATIONS_CACHE_TTL", "86400"))
+recommendations_cache = make_cache("recommendations", ttl=RECOMMENDATIONS_CACHE_TTL, max_entries=5000)
+
+# LLM rating enrichments keyed by VIN
+RATINGS_CACHE_TTL = int(os.getenv("RATINGS_CACHE_TTL", "86400"))
+ratings_cache = make_cache("ratings", ttl=RATINGS_CACHE_TTL, max_entries=5000)
+
+# Photo galleries keyed by VIN; listing photos rarely change. VINs without a
+# gallery are cached as [] for the shorter PHOTO_MISS_TTL.
+PHOTO_CACHE_TTL = int(os.getenv("PHOTO_CACHE_TTL", "604800"))
+PHOTO_MISS_TTL = int(os.getenv("PHOTO_MISS_TTL", "3600"))
+photo_cache = make_cache("photos", ttl=PHOTO_CACHE_TTL, max_entries=10000)
+
+# First-turn chat answers keyed by VIN (see chat_cache.py)
+CHAT_ANSWER_TTL = int(os.getenv("CHAT_ANSWER_TTL", "86400"))
+chat_answers_cache = make_cache("chat_answers", ttl=CHAT_ANSWER_TTL, max_entries=2000)
+
+# Paginated search sessions keyed by cursor: query plan, fetched pages and their VINs.
+# Every cached first page points at one and sessions outlive it, so keep twice the slots.
+SEARCH_SESSION_TTL = int(os.getenv("SEARCH_SESSION_TTL", "1800"))
+search_sessions = make_cache("search_sessions", ttl=SEARCH_SESSION_TTL, max_entries=2 * listings_cache.max_entries)
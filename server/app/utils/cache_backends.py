@@ -0,0 +1,191 @@
+"""
+Shared cache backends
+=====================
+Cache backends that outlive a single process, so every gunicorn worker and
+serverless instance reads the same entries and a cold start begins warm.
+
+    SQLiteCache  one WAL-mode database file per host (CACHE_SQLITE_PATH);
+                 safe for concurrent readers and writers across processes
+    RedisCache   any Redis-protocol server (REDIS_URL); needs the optional
+                 ``redis`` package, or pass a client such as fakeredis
+
+Values are pickled and zlib-compressed above COMPRESS_THRESHOLD bytes.
+Recompute locks are a lock row / ``SET NX PX`` key with an expiry, so a
+crashed holder never blocks a key for longer than the lock timeout.
+"""
+
+import json
+import os
+import pickle
+import secrets
+import threading
+import time
+import zlib
+
+from .cache import Cache
+
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", os.path.join(os.getenv("TMPDIR", "/tmp"), "revvo-cache.sqlite3"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Values larger than this many bytes are stored zlib-compressed
+COMPRESS_THRESHOLD = 1024
+
+
+def dumps(value):
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) > COMPRESS_THRESHOLD:
+        return b"z" + zlib.compress(data)
+    return b"p" + data
+
+
+def loads(data):
+    if data is None:
+        return None
+    data = bytes(data)
+    return pickle.loads(zlib.decompress(data[1:]) if data[:1] == b"z" else data[1:])
+
+
+def _key(key):
+    """Stable string form of a cache key (VINs, cell keys, sorted query-arg tuples)."""
+    return key if isinstance(key, str) else json.dumps(key, separators=(",", ":"))
+
+
+class SQLiteCache(Cache):
+    """TTL cache in a shared SQLite file; the oldest entries are trimmed past ``max_entries``."""
+
+    def __init__(self, ttl, max_entries=256, compact=False, name="cache", path=None):
+        super().__init__(ttl, max_entries, compact, name)
+        self.path = path or CACHE_SQLITE_PATH
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import sqlite3
+
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "namespace TEXT, key TEXT, expires_at REAL, value BLOB, PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_entries_expiry ON cache_entries (namespace, expires_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_locks ("
+                "namespace TEXT, key TEXT, token TEXT, expires_at REAL, PRIMARY KEY (namespace, key))"
+            )
+            self._local.conn = conn
+        return conn
+
+    def _load(self, key):
+        row = self._connection().execute(
+            "SELECT value FROM cache_entries WHERE namespace = ? AND key = ? AND expires_at >= ?",
+            (self.name, _key(key), time.time()),
+        ).fetchone()
+        return loads(row[0]) if row else None
+
+    def _store(self, key, value, ttl):
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?)",
+            (self.name, _key(key), now + ttl, dumps(value)),
+        )
+        conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND expires_at < ?", (self.name, now))
+        conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+            "SELECT key FROM cache_entries WHERE namespace = ? ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.name, self.name, self.max_entries),
+        )
+
+    def delete(self, key):
+        self._connection().execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.name, _key(key))
+        )
+
+    def try_lock(self, key, timeout):
+        now = time.time()
+        token = secrets.token_hex(8)
+        conn = self._connection()
+        conn.execute(
+            "DELETE FROM cache_locks WHERE namespace = ? AND key = ? AND expires_at < ?", (self.name, _key(key), now)
+        )
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO cache_locks VALUES (?, ?, ?, ?)", (self.name, _key(key), token, now + timeout)
+        )
+        return token if cursor.rowcount == 1 else None
+
+    def release_lock(self, key, token):
+        self._connection().execute(
+            "DELETE FROM cache_locks WHERE namespace = ? AND key = ? AND token = ?", (self.name, _key(key), token)
+        )
+
+    def clear(self):
+        conn = self._connection()
+        conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.name,))
+        conn.execute("DELETE FROM cache_locks WHERE namespace = ?", (self.name,))
+
+    def __len__(self):
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM cache_entries WHERE namespace = ? AND expires_at >= ?", (self.name, time.time())
+        ).fetchone()[0]
+
+
+# Deletes the lock only if it still holds our token
+_RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+
+class RedisCache(Cache):
+    """
+    TTL cache on a Redis-protocol server.
+
+    Entries expire server-side; ``max_entries`` is left to the server's
+    maxmemory eviction policy.
+    """
+
+    def __init__(self, ttl, max_entries=256, compact=False, name="cache", client=None):
+        super().__init__(ttl, max_entries, compact, name)
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+
+            self._client = redis.Redis.from_url(REDIS_URL)
+        return self._client
+
+    def _redis_key(self, key):
+        return f"revvo:{self.name}:{_key(key)}"
+
+    def _load(self, key):
+        return loads(self.client.get(self._redis_key(key)))
+
+    def _store(self, key, value, ttl):
+        self.client.set(self._redis_key(key), dumps(value), px=int(ttl * 1000))
+
+    def delete(self, key):
+        self.client.delete(self._redis_key(key))
+
+    def try_lock(self, key, timeout):
+        token = secrets.token_hex(8)
+        acquired = self.client.set(f"{self._redis_key(key)}:lock", token, nx=True, px=int(timeout * 1000))
+        return token if acquired else None
+
+    def release_lock(self, key, token):
+        lock_key = f"{self._redis_key(key)}:lock"
+        try:
+            self.client.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+        except Exception:
+            # Server without scripting: plain compare-and-delete
+            if self.client.get(lock_key) == token.encode():
+                self.client.delete(lock_key)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=f"revvo:{self.name}:*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def __len__(self):
+        return sum(1 for key in self.client.scan_iter(match=f"revvo:{self.name}:*") if not key.endswith(b":lock"))
@@ -0,0 +1,160 @@
+"""
+Chat Answer Cache
+=================
+Per-VIN cache of first-turn chat answers ("is this a good deal?", "how
+reliable is it?"). A new first-turn question reuses a stored answer when
+its normalized text matches exactly, or when its hashed n-gram vector is
+close enough (cosine >= CHAT_SIMILARITY_THRESHOLD) to a stored question.
+
+Only cars the server knows (``listing_store``) are cached, and both the
+prompt and the cache key are built from that server-side record via
+``car_from_record`` -- never from the car the client posted, so one
+crafted request can't plant an answer other users get for a VIN. Answers
+are tied to a fingerprint of the car's own facts (price, miles, history and
+the descriptive prompt fields); when any of those change, the stored answers
+for that VIN no longer match and are dropped. The ratings are left out:
+expectedPrice, marketSampleSize and the deal/value scores are re-derived
+from whichever listings share the market group, and LLM ratings land after
+the first search, so hashing them would drop answers for an unchanged car.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import zlib
+
+from .cache import chat_answers_cache
+from .scoring import merge_llm_ratings
+
+CHAT_SIMILARITY_THRESHOLD = float(os.getenv("CHAT_SIMILARITY_THRESHOLD", "0.9"))
+MAX_ANSWERS_PER_VIN = 20
+
+# Prompt fields a cached answer is tied to: everything but the derived ratings
+FINGERPRINT_FIELDS = (
+    "vin", "make", "model", "year", "price", "mileage", "location", "transmission", "fuel",
+    "exteriorColor", "interiorColor", "description", "history",
+)
+
+# Hashed feature space for question vectors
+VECTOR_BUCKETS = 4096
+
+# Words that don't change what's being asked about a given car; negations stay
+FILLER_WORDS = {
+    "a", "an", "the", "is", "it", "its", "this", "that", "car", "vehicle", "one", "be", "would", "does",
+    "do", "me", "tell", "can", "you", "i", "please", "about", "of", "for", "really", "like", "what", "whats", "how",
+}
+
+
+def normalize_question(text):
+    """Lowercase words with punctuation dropped: "What's the MPG?" -> ["whats", "the", "mpg"]."""
+    return re.sub(r"[^a-z0-9 ]+", "", str(text or "").lower()).split()
+
+
+def question_vector(words):
+    """
+    L2-normalized sparse vector of hashed word unigrams, word bigrams and
+    character trigrams over the non-filler words. crc32 keeps buckets stable
+    across processes.
+    """
+    words = [word for word in words if word not in FILLER_WORDS] or words
+    text = f" {' '.join(words)} "
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    features += [text[i:i + 3] for i in range(len(text) - 2)]
+    vector = {}
+    for feature in features:
+        bucket = zlib.crc32(feature.encode("utf-8")) % VECTOR_BUCKETS
+        vector[bucket] = vector.get(bucket, 0) + 1
+    norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+    return {bucket: weight / norm for bucket, weight in vector.items()}
+
+
+def similarity(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(bucket, 0.0) for bucket, weight in a.items())
+
+
+def car_from_record(vin, record, llm_ratings=None):
+    """
+    The chat prompt's view of a cleaned ``listing_store`` record, in the
+    shape the client posts (see CarListings.tsx), with cached LLM ratings
+    layered over the local scores.
+    """
+    vehicle = record.get("vehicle") or {}
+    retail = record.get("retailListing") or {}
+    return {
+        "vin": vin,
+        "make": vehicle.get("make") or "Unknown",
+        "model": vehicle.get("model") or "N/A",
+        "year": vehicle.get("year") or 0,
+        "price": retail.get("price") or 0,
+        "mileage": retail.get("miles") or 0,
+        "location": f"{retail.get('city') or 'Unknown'}, {retail.get('state') or ''}",
+        "transmission": vehicle.get("transmission"),
+        "fuel": vehicle.get("fuel"),
+        "exteriorColor": vehicle.get("exteriorColor"),
+        "interiorColor": vehicle.get("interiorColor"),
+        "description": f"{vehicle.get('make') or ''} {vehicle.get('model') or ''} {vehicle.get('trim') or ''}"
+                       f" — {vehicle.get('engine') or 'N/A'} engine, {vehicle.get('transmission') or ''}",
+        "ratings": merge_llm_ratings(record.get("ratings") or {}, llm_ratings),
+        "history": record.get("history") or {},
+    }
+
+
+def car_fingerprint(car):
+    """Hash of the car's facts a cached answer depends on (FINGERPRINT_FIELDS)."""
+    facts = {field: car.get(field) for field in FINGERPRINT_FIELDS}
+    return hashlib.sha1(json.dumps(facts, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def _entries(vin, fingerprint):
+    """Stored answers for a VIN, or [] when the car's facts changed since they were stored."""
+    cached = chat_answers_cache.get(vin)
+    if cached is None:
+        return []
+    if cached["fingerprint"] != fingerprint:
+        chat_answers_cache.delete(vin)
+        return []
+    return cached["answers"]
+
+
+def lookup_answer(car, message):
+    """
+    Cached reply for a first-turn question about ``car``.
+
+    Returns:
+        str | None: the reply, or None on a miss (or when the car has no VIN)
+    """
+    vin = car.get("vin")
+    words = normalize_question(message)
+    if not vin or not words:
+        return None
+    answers = _entries(vin, car_fingerprint(car))
+    if not answers:
+        return None
+
+    question = " ".join(words)
+    for answer in answers:
+        if answer["question"] == question:
+            return answer["reply"]
+
+    vector = question_vector(words)
+    best = max(answers, key=lambda answer: similarity(vector, answer["vector"]))
+    if similarity(vector, best["vector"]) >= CHAT_SIMILARITY_THRESHOLD:
+        return best["reply"]
+    return None
+
+
+def store_answer(car, message, reply):
+    """Remember a first-turn reply; the oldest answers are dropped past MAX_ANSWERS_PER_VIN."""
+    vin = car.get("vin")
+    words = normalize_question(message)
+    if not vin or not words or not reply:
+        return
+    fingerprint = car_fingerprint(car)
+    question = " ".join(words)
+    answers = [answer for answer in _entries(vin, fingerprint) if answer["question"] != question]
+    answers.append({"question": question, "vector": question_vector(words), "reply": reply})
+    chat_answers_cache.set(vin, {"fingerprint": fingerprint, "answers": answers[-MAX_ANSWERS_PER_VIN:]})
@@ -0,0 +1,114 @@
+"""
+Incremental Facets
+==================
+Filter metadata (ranges, categorical values with counts, price/mileage
+histograms) accumulated one listing at a time. Accumulators merge, so
+concurrent workers and paginated results can each keep their own and
+combine them.
+"""
+
+from collections import Counter
+
+PRICE_BUCKET_SIZE = 5000
+MILES_BUCKET_SIZE = 20000
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class FacetAccumulator:
+    """O(1)-per-listing accumulator producing a search's "filters" metadata plus counts."""
+
+    def __init__(self):
+        self.count = 0
+        self.price_min = self.price_max = None
+        self.miles_min = self.miles_max = None
+        self.makes = Counter()
+        self.models = {}                 # make -> Counter(model)
+        self.years = Counter()
+        self.colors = Counter()
+        self.price_buckets = Counter()   # bucket index -> count
+        self.miles_buckets = Counter()
+
+    def add(self, listing):
+        vehicle = listing.get("vehicle", {})
+        retail = listing.get("retailListing", {})
+        self.count += 1
+
+        miles = retail.get("miles")
+        price = retail.get("price")
+        year = vehicle.get("year")
+
+        if _is_number(miles):
+            self.miles_min = miles if self.miles_min is None else min(self.miles_min, miles)
+            self.miles_max = miles if self.miles_max is None else max(self.miles_max, miles)
+            self.miles_buckets[int(miles // MILES_BUCKET_SIZE)] += 1
+        if _is_number(price):
+            self.price_min = price if self.price_min is None else min(self.price_min, price)
+            self.price_max = price if self.price_max is None else max(self.price_max, price)
+            self.price_buckets[int(price // PRICE_BUCKET_SIZE)] += 1
+        if _is_number(year):
+            self.years[year] += 1
+
+        make = vehicle.get("make")
+        model = vehicle.get("model")
+        color = vehicle.get("exteriorColor")
+        if make:
+            self.makes[make] += 1
+            models = self.models.setdefault(make, Counter())
+            if model:
+                models[model] += 1
+        if color:
+            self.colors[color] += 1
+        return self
+
+    def merge(self, other):
+        """Fold another accumulator into this one (in place)."""
+        self.count += other.count
+        for attr, pick in (("price_min", min), ("price_max", max), ("miles_min", min), ("miles_max", max)):
+            mine, theirs = getattr(self, attr), getattr(other, attr)
+            setattr(self, attr, theirs if mine is None else mine if theirs is None else pick(mine, theirs))
+        self.makes.update(other.makes)
+        for make, models in other.models.items():
+            self.models.setdefault(make, Counter()).update(models)
+        self.years.update(other.years)
+        self.colors.update(other.colors)
+        self.price_buckets.update(other.price_buckets)
+        self.miles_buckets.update(other.miles_buckets)
+        return self
+
+    @staticmethod
+    def _histogram(buckets, size):
+        return [
+            {"min": index * size, "max": (index + 1) * size, "count": buckets[index]}
+            for index in sorted(buckets)
+        ]
+
+    def to_filters(self):
+        """
+        Render the accumulated facets.
+
+        Returns:
+            dict: ranges, makes, models grouped by make, years and
+                  exteriorColors, plus "counts" and "histograms"
+        """
+        return {
+            "mileageRange": {"min": self.miles_min, "max": self.miles_max},
+            "priceRange": {"min": self.price_min, "max": self.price_max},
+            "makes": sorted(self.makes),
+            "models": {make: sorted(models) for make, models in self.models.items()},
+            "years": sorted(self.years),
+            "exteriorColors": sorted(self.colors),
+            "counts": {
+                "listings": self.count,
+                "makes": dict(self.makes),
+                "models": {make: dict(models) for make, models in self.models.items()},
+                "years": dict(self.years),
+                "exteriorColors": dict(self.colors),
+            },
+            "histograms": {
+                "price": self._histogram(self.price_buckets, PRICE_BUCKET_SIZE),
+                "miles": self._histogram(self.miles_buckets, MILES_BUCKET_SIZE),
+            },
+        }
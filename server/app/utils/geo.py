@@ -0,0 +1,105 @@
+"""
+ZIP Radius Search
+=================
+Bundled ZIP centroid table (data/zip_centroids.csv.gz, active ZIPs in the 50
+states + DC, from the MIT-licensed `zipcodes` package data) with a grid-bucket
+spatial index for "everything within N miles of this ZIP" queries.
+"""
+
+import csv
+import gzip
+import math
+import os
+
+ZIP_TABLE_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "zip_centroids.csv.gz")
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LAT = 69.0
+GRID_DEGREES = 0.5               # spatial index cell size (~35 x 25 miles at US latitudes)
+DEFAULT_RADIUS_MILES = 50
+MAX_RADIUS_MILES = 300
+
+_index = None
+
+
+def _cell(lat, lon):
+    return (math.floor(lat / GRID_DEGREES), math.floor(lon / GRID_DEGREES))
+
+
+def load_zip_index():
+    """
+    Load the ZIP table once and bucket every ZIP into a lat/lon grid cell.
+
+    Returns:
+        dict: {"zips": {zip: (lat, lon, state)}, "grid": {cell: [zip, ...]}}
+    """
+    global _index
+    if _index is None:
+        zips, grid = {}, {}
+        with gzip.open(ZIP_TABLE_PATH, "rt") as f:
+            for row in csv.DictReader(f):
+                lat, lon = float(row["lat"]), float(row["lon"])
+                zips[row["zip"]] = (lat, lon, row["state"])
+                grid.setdefault(_cell(lat, lon), []).append(row["zip"])
+        _index = {"zips": zips, "grid": grid}
+    return _index
+
+
+def normalize_zip(zip_code):
+    """First five digits of a ZIP / ZIP+4, zero-padded; None if not a ZIP."""
+    digits = "".join(c for c in str(zip_code or "").split("-")[0] if c.isdigit())
+    return digits[:5].zfill(5) if digits else None
+
+
+def lookup_zip(zip_code):
+    """(lat, lon, state) for a ZIP, or None when it's not in the table."""
+    zip_code = normalize_zip(zip_code)
+    return load_zip_index()["zips"].get(zip_code) if zip_code else None
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+
+def zips_within(zip_code, radius_miles):
+    """
+    Every ZIP whose centroid lies within ``radius_miles`` of ``zip_code``.
+
+    Only grid cells overlapping the radius' bounding box are scanned.
+
+    Returns:
+        list: [(zip, distance in miles, state), ...] nearest first
+    """
+    origin = lookup_zip(zip_code)
+    if origin is None:
+        return []
+    lat, lon, _ = origin
+    index = load_zip_index()
+
+    lat_span = radius_miles / MILES_PER_DEGREE_LAT
+    lon_span = radius_miles / (MILES_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+    min_cell = _cell(lat - lat_span, lon - lon_span)
+    max_cell = _cell(lat + lat_span, lon + lon_span)
+
+    matches = []
+    for cell_lat in range(min_cell[0], max_cell[0] + 1):
+        for cell_lon in range(min_cell[1], max_cell[1] + 1):
+            for other in index["grid"].get((cell_lat, cell_lon), ()):
+                other_lat, other_lon, state = index["zips"][other]
+                distance = haversine_miles(lat, lon, other_lat, other_lon)
+                if distance <= radius_miles:
+                    matches.append((other, distance, state))
+    matches.sort(key=lambda match: match[1])
+    return matches
+
+
+def states_within(zip_code, radius_miles):
+    """States with at least one ZIP inside the radius, the origin's state first."""
+    states = []
+    for _, _, state in zips_within(zip_code, radius_miles):
+        if state not in states:
+            states.append(state)
+    return states
+
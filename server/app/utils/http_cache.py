@@ -0,0 +1,67 @@
+"""
+HTTP caching helpers
+====================
+Stable content hashing and conditional-GET responses (ETag / If-None-Match).
+"""
+
+import hashlib
+import json
+
+from quart import current_app, jsonify, request
+
+
+def compute_etag(payload):
+    """
+    Compute a stable content hash for a JSON-serializable payload.
+
+    Keys are sorted so dict ordering never changes the tag.
+    """
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:32]
+
+
+def conditional_json(payload, etag=None, max_age=60, keep_order=False):
+    """
+    Build a JSON response carrying ``ETag`` and ``Cache-Control`` headers.
+
+    Answers with ``304 Not Modified`` (and no body) when the request's
+    ``If-None-Match`` matches the payload's tag, without serializing it.
+
+    Args:
+        payload (dict): response body
+        etag (str): precomputed tag, computed from ``payload`` when omitted
+        max_age (int): seconds clients may reuse the response without revalidating
+        keep_order (bool): serialize dict keys in insertion order instead of
+                           sorted, for payloads whose order is meaningful
+    """
+    etag = etag or compute_etag(payload)
+    unchanged = not_modified(etag, max_age)
+    if unchanged is not None:
+        return unchanged
+    if keep_order:
+        body = current_app.json.dumps(payload, sort_keys=False, separators=(",", ":"))
+        response = current_app.response_class(f"{body}\n", mimetype=current_app.json.mimetype)
+    else:
+        response = jsonify(payload)
+    response.set_etag(etag)
+    _set_cache_control(response, max_age)
+    return response
+
+
+def not_modified(etag, max_age=60):
+    """
+    ``304 Not Modified`` response when the request's ``If-None-Match`` matches
+    ``etag``, else None. Lets callers skip rebuilding a cached payload.
+    """
+    if not request.if_none_match.contains(etag):
+        return None
+    response = current_app.response_class("", status=304)
+    response.set_etag(etag)
+    _set_cache_control(response, max_age)
+    return response
+
+
+def _set_cache_control(response, max_age):
+    response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    response.cache_control.must_revalidate = True
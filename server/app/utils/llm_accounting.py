@@ -0,0 +1,169 @@
+"""
+LLM Call Accounting
+===================
+Tokens, latency, model and outcome for every OpenAI completion, grouped by
+call site (recommendation, rating, chat, and their ``.repair`` retries) and
+the route that triggered it. Aggregates are served under "llm" in /metrics;
+each call is also appended as a JSON line to a rolling local log
+(LLM_LOG_PATH, rotated at LLM_LOG_MAX_BYTES).
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from quart import has_request_context, request
+
+LLM_LOG_PATH = os.getenv("LLM_LOG_PATH", os.path.join(os.getenv("TMPDIR", "/tmp"), "revvo-llm-calls.jsonl"))
+LLM_LOG_MAX_BYTES = int(os.getenv("LLM_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+LLM_LOG_BACKUPS = 3
+
+# USD per 1M (prompt, completion) tokens, for the cost estimate
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+
+_stats = {}
+_lock = threading.Lock()
+_logger = None
+
+
+class Call:
+    """One tracked completion; filled in by the caller inside ``track``."""
+
+    def __init__(self, call_site, model):
+        self.call_site = call_site
+        self.model = model
+        self.outcome = "ok"
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def record_response(self, response):
+        self.model = getattr(response, "model", None) or self.model
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.prompt_tokens = usage.prompt_tokens or 0
+            self.completion_tokens = usage.completion_tokens or 0
+
+
+def _route():
+    if has_request_context() and request.url_rule is not None:
+        return request.url_rule.rule
+    return "offline"
+
+
+def _cost(model, prompt_tokens, completion_tokens):
+    for name, (prompt_price, completion_price) in MODEL_PRICES.items():
+        if model == name or model.startswith(f"{name}-"):
+            return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+    return 0.0
+
+
+def _get_logger():
+    global _logger
+    if _logger is None:
+        import logging
+        from logging.handlers import RotatingFileHandler
+
+        logger = logging.getLogger("revvo.llm_calls")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        try:
+            handler = RotatingFileHandler(LLM_LOG_PATH, maxBytes=LLM_LOG_MAX_BYTES, backupCount=LLM_LOG_BACKUPS)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+        except OSError as e:
+            print(f"⚠️ LLM call log disabled: {e}")
+        _logger = logger
+    return _logger
+
+
+def record(call, route, latency_ms):
+    """Fold one finished call into the aggregates and the rolling log."""
+    cost = _cost(call.model, call.prompt_tokens, call.completion_tokens)
+    with _lock:
+        entry = _stats.setdefault(call.call_site, {}).setdefault(route, {
+            "calls": 0, "outcomes": {}, "models": {},
+            "promptTokens": 0, "completionTokens": 0,
+            "latencyMsTotal": 0.0, "latencyMsMax": 0.0, "estimatedCostUsd": 0.0,
+        })
+        entry["calls"] += 1
+        entry["outcomes"][call.outcome] = entry["outcomes"].get(call.outcome, 0) + 1
+        entry["models"][call.model] = entry["models"].get(call.model, 0) + 1
+        entry["promptTokens"] += call.prompt_tokens
+        entry["completionTokens"] += call.completion_tokens
+        entry["latencyMsTotal"] += latency_ms
+        entry["latencyMsMax"] = max(entry["latencyMsMax"], latency_ms)
+        entry["estimatedCostUsd"] += cost
+
+    _get_logger().info(json.dumps({
+        "ts": round(time.time(), 3),
+        "callSite": call.call_site,
+        "route": route,
+        "model": call.model,
+        "outcome": call.outcome,
+        "promptTokens": call.prompt_tokens,
+        "completionTokens": call.completion_tokens,
+        "latencyMs": round(latency_ms, 1),
+        "estimatedCostUsd": round(cost, 6),
+    }))
+
+
+@contextmanager
+def track(call_site, model):
+    """
+    Time a completion and record it when the block exits.
+
+    The outcome is "ok" unless the block sets ``call.outcome`` (e.g.
+    "invalid_output"), raises ("error"), or is cancelled by a hedge
+    timeout ("cancelled").
+    """
+    call = Call(call_site, model)
+    route = _route()
+    started = time.perf_counter()
+    try:
+        yield call
+    except (asyncio.CancelledError, asyncio.TimeoutError):
+        call.outcome = "cancelled"
+        raise
+    except Exception:
+        call.outcome = "error"
+        raise
+    finally:
+        record(call, route, (time.perf_counter() - started) * 1000)
+
+
+def snapshot():
+    """
+    Aggregates per call site and route.
+
+    Returns:
+        dict: {call_site: {route: {"calls", "outcomes", "models", "promptTokens",
+               "completionTokens", "avgLatencyMs", "maxLatencyMs", "estimatedCostUsd"}}}
+    """
+    with _lock:
+        return {
+            call_site: {
+                route: {
+                    "calls": entry["calls"],
+                    "outcomes": dict(entry["outcomes"]),
+                    "models": dict(entry["models"]),
+                    "promptTokens": entry["promptTokens"],
+                    "completionTokens": entry["completionTokens"],
+                    "avgLatencyMs": round(entry["latencyMsTotal"] / entry["calls"], 1),
+                    "maxLatencyMs": round(entry["latencyMsMax"], 1),
+                    "estimatedCostUsd": round(entry["estimatedCostUsd"], 6),
+                }
+                for route, entry in routes.items()
+            }
+            for call_site, routes in _stats.items()
+        }
+
+
+def reset():
+    with _lock:
+        _stats.clear()
@@ -0,0 +1,187 @@
+"""
+Local Recommendation Engine
+===========================
+Ranks cars from the bundled make/model/year catalog (data/car_catalog.json)
+for a buyer's state, budget, primary use and comfort level. Used as the
+hedged fallback when the LLM recommendation is slow or fails.
+
+Catalog entries carry ``"years": [first, last]``; ``last`` is null while the
+model is still sold, so its newest year follows the calendar.
+"""
+
+import json
+import math
+import os
+
+from .scoring import ANNUAL_DEPRECIATION, current_year
+
+CATALOG_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "car_catalog.json")
+
+# Keyword in primary_use / comfort -> ("body" | "tag", value). Keywords of four
+# or more letters also match as prefixes ("commut" -> "commuting").
+PREFERENCE_KEYWORDS = {
+    "sport": ("tag", "sport"),
+    "luxury": ("tag", "luxury"),
+    "premium": ("tag", "luxury"),
+    "suv": ("body", "SUV"),
+    "crossover": ("body", "SUV"),
+    "sedan": ("body", "Sedan"),
+    "truck": ("body", "Truck"),
+    "pickup": ("body", "Truck"),
+    "minivan": ("body", "Minivan"),
+    "van": ("body", "Minivan"),
+    "wagon": ("body", "Wagon"),
+    "hatchback": ("body", "Hatchback"),
+    "coupe": ("body", "Coupe"),
+    "convertible": ("body", "Convertible"),
+    "compact": ("tag", "economy"),
+    "economy": ("tag", "economy"),
+    "budget": ("tag", "economy"),
+    "electric": ("tag", "electric"),
+    "ev": ("tag", "electric"),
+    "hybrid": ("tag", "hybrid"),
+    "commut": ("tag", "commute"),
+    "daily": ("tag", "commute"),
+    "family": ("tag", "family"),
+    "kids": ("tag", "family"),
+    "offroad": ("tag", "offroad"),
+    "off-road": ("tag", "offroad"),
+    "tow": ("tag", "towing"),
+    "towing": ("tag", "towing"),
+    "work": ("tag", "work"),
+    "haul": ("tag", "work"),
+    "trip": ("tag", "road trips"),
+    "weekend": ("tag", "road trips"),
+    "city": ("tag", "city"),
+    "urban": ("tag", "city"),
+    "snow": ("tag", "awd"),
+    "cargo": ("tag", "cargo"),
+}
+
+# "electric" shoppers are usually happy with a hybrid too
+RELATED_TAGS = {"electric": {"hybrid"}}
+
+# States where all-wheel drive earns a bonus
+SNOW_STATES = {"AK", "CO", "CT", "IA", "ID", "MA", "ME", "MI", "MN", "MT", "ND", "NH", "NY", "PA", "SD", "UT", "VT", "WI", "WY"}
+
+_catalog = None
+
+
+def load_catalog():
+    """Load and index the bundled catalog once."""
+    global _catalog
+    if _catalog is None:
+        with open(CATALOG_PATH) as f:
+            entries = json.load(f)
+        for entry in entries:
+            entry["tagSet"] = set(entry["tags"])
+        _catalog = entries
+    return _catalog
+
+
+def parse_preferences(*texts):
+    """Extract wanted body styles and tags from free-text use/comfort strings."""
+    bodies, tags = set(), set()
+    for text in texts:
+        for word in str(text or "").lower().replace("_", " ").split():
+            for keyword, (kind, value) in PREFERENCE_KEYWORDS.items():
+                if word == keyword or (len(keyword) >= 4 and word.startswith(keyword)):
+                    if kind == "body":
+                        bodies.add(value)
+                    else:
+                        tags.add(value)
+                        tags |= RELATED_TAGS.get(value, set())
+    return bodies, tags
+
+
+def parse_budget(budget):
+    """
+    A buyer's max price as a positive float, or None when none was given.
+
+    Raises:
+        ValueError: for zero, negative, non-finite or non-numeric budgets
+    """
+    if budget is None or budget == "":
+        return None
+    value = float(budget)
+    if not math.isfinite(value) or value <= 0:
+        raise ValueError(f"budget must be a positive number, got {budget!r}")
+    return value
+
+
+def newest_affordable_year(entry, budget):
+    """
+    Newest model year whose depreciated MSRP fits the budget, or None.
+
+    Solved in closed form: msrp * (1 - d) ** age <= budget.
+    """
+    first, last = entry["years"]
+    last = current_year() if last is None else min(last, current_year())
+    if not budget:
+        return last
+    msrp = entry["baseMsrp"]
+    if msrp <= budget:
+        return last
+    min_age = math.ceil(math.log(budget / msrp) / math.log(1 - ANNUAL_DEPRECIATION))
+    year = min(last, current_year() - min_age)
+    return year if year >= first else None
+
+
+def estimated_price(entry, year):
+    return entry["baseMsrp"] * (1 - ANNUAL_DEPRECIATION) ** max(0, current_year() - year)
+
+
+def recommend_local(state, budget, primary_use, comfort, limit=3):
+    """
+    Rank catalog cars for a buyer.
+
+    Args:
+        state (str): two-letter state code
+        budget (int|str|None): max price
+        primary_use (str): free text or a comfort-level keyword (e.g. "suv")
+        comfort (str): comfort level / car type
+        limit (int): number of cars to return, at most one per make
+
+    Returns:
+        list: [{"make", "model", "year", "price"}, ...] best match first,
+              the same shape as validated LLM recommendations
+    """
+    try:
+        budget = parse_budget(budget)
+    except (TypeError, ValueError):
+        # Routes reject bad budgets; anything else ranks without one
+        budget = None
+    bodies, tags = parse_preferences(primary_use, comfort)
+    snowy = (state or "").upper() in SNOW_STATES
+
+    ranked = []
+    for entry in load_catalog():
+        year = newest_affordable_year(entry, budget)
+        if year is None:
+            continue
+
+        score = entry["reliability"]
+        if entry["bodyStyle"] in bodies:
+            score += 3.0
+        score += 1.5 * len(tags & entry["tagSet"])
+        if snowy and "awd" in entry["tagSet"]:
+            score += 0.5
+        score -= 0.1 * (current_year() - year)
+        ranked.append((score, entry, year))
+
+    ranked.sort(key=lambda item: item[0], reverse=True)
+
+    recommendations, makes = [], set()
+    for score, entry, year in ranked:
+        if entry["make"] in makes:
+            continue
+        makes.add(entry["make"])
+        recommendations.append({
+            "make": entry["make"],
+            "model": entry["model"],
+            "year": year,
+            "price": int(round(estimated_price(entry, year), -2)),
+        })
+        if len(recommendations) == limit:
+            break
+    return recommendations
@@ -0,0 +1,26 @@
+"""
+In-process metrics
+==================
+Thread-safe counters exposed through the /metrics endpoint.
+"""
+
+import threading
+
+_counters = {}
+_lock = threading.Lock()
+
+
+def increment(name, value=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def snapshot():
+    """Return a copy of every counter."""
+    with _lock:
+        return dict(_counters)
+
+
+def reset():
+    with _lock:
+        _counters.clear()
@@ -1,15 +1,56 @@
-from flask import jsonify
-import requests
-import os, json
-from openai import OpenAI
+import os
+from .schemas import SchemaError, extract_json, validate_recommendations, validate_ratings
+from . import llm_accounting
+
+MODEL = "gpt-4o-mini"
+
+_async_client = None
+
+
+def get_async_openai_client():
+    """Return a shared AsyncOpenAI client, importing the SDK on first use to keep cold starts cheap."""
+    global _async_client
+    if _async_client is None:
+        from openai import AsyncOpenAI
+        _async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _async_client
 
-def get_car_recommendation(state, budget, primary_use, comfort):
-    key = os.getenv("OPENAI_API_KEY")
-    if not key:
-        return jsonify({"error": "Missing OpenAI API key"}), 500
 
-    client = OpenAI(api_key=key)
+def _repair_messages(messages, raw, error):
+    """Follow-up turn asking the model to fix exactly what failed validation."""
+    return messages + [
+        {"role": "assistant", "content": raw},
+        {"role": "user", "content": f"That JSON was invalid: {error}. Reply with only the corrected JSON object."},
+    ]
 
+
+async def _complete_structured(client, call_site, messages, validate, temperature):
+    """
+    Run a JSON-mode completion and validate it, retrying once with a targeted
+    repair prompt when the output doesn't match the schema. Each attempt is
+    accounted under ``call_site`` (the retry as ``<call_site>.repair``).
+    """
+    for attempt in range(2):
+        with llm_accounting.track(call_site if attempt == 0 else f"{call_site}.repair", MODEL) as call:
+            response = await client.chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                temperature=temperature,
+                response_format={"type": "json_object"},
+            )
+            call.record_response(response)
+            raw = response.choices[0].message.content or ""
+            try:
+                return validate(extract_json(raw))
+            except SchemaError as e:
+                print(f"⚠️ Invalid structured output (attempt {attempt + 1}): {e}")
+                call.outcome = "invalid_output"
+                error = e
+                messages = _repair_messages(messages, raw, e)
+    raise error
+
+
+def _recommendation_messages(state, budget, primary_use, comfort):
     # Construct a prompt for OpenAI
     prompt = f"""
     You are an expert car consultant. Suggest top 3 cars (make, model, and year) that best fit
@@ -26,50 +67,41 @@ def get_car_recommendation(state, budget, primary_use, comfort):
     3. Year (within budget range)
     4. Estimated price based on current market trends
 
-    Respond in JSON format as a list of objects with keys:
-    ["make", "model", "year", "price"].
+    Respond with a JSON object of the form:
+    {{"recommendations": [{{"make": "Toyota", "model": "Camry", "year": 2018, "price": 17500}}]}}
+    where "year" and "price" are numbers.
 
     Do NOT include any additional explanations or reasons.
     """
+    return [
+        {"role": "system", "content": "You are a helpful car buying assistant."},
+        {"role": "user", "content": prompt}
+    ]
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a helpful car buying assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
-        )
 
-        raw = response.choices[0].message.content.strip()
+async def get_car_recommendation_async(state, budget, primary_use, comfort):
+    """Top car picks for a buyer from the LLM, schema-validated: {"recommendations"} or {"error"}."""
+    key = os.getenv("OPENAI_API_KEY")
+    if not key:
+        return {"error": "Missing OpenAI API key"}
 
-        # Try to parse the response into JSON
-        import json
-        try:
-            recommendations = json.loads(raw)
-        except json.JSONDecodeError:
-            # If parsing fails, wrap raw text
-            recommendations = {"text": raw}
+    client = get_async_openai_client()
 
-        return jsonify({
-            "recommendations": recommendations
-        })
+    try:
+        recommendations = await _complete_structured(
+            client,
+            "recommendation",
+            _recommendation_messages(state, budget, primary_use, comfort),
+            validate_recommendations,
+            0.7,
+        )
+        return {"recommendations": recommendations}
 
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
-    
-def get_car_rating(vehicle_data):
-    key = os.getenv("OPENAI_API_KEY")
-    if not key:
-        return jsonify({"error": "Missing OpenAI API key"}), 500
+        return {"error": str(e)}
 
-    client = OpenAI(api_key=key)
-
-    # Validate
-    if not vehicle_data:
-        return jsonify({"error": "Missing vehicle data"}), 400
 
+def _rating_messages(vehicle_data):
     # Build prompt for OpenAI
     prompt = f"""
     You are an automotive analyst that evaluates used cars based on reliability, cost, and satisfaction.
@@ -99,37 +131,32 @@ def get_car_rating(vehicle_data):
       "overallRating": 3.69
     }}
     """
+    return [
+        {"role": "system", "content": "You are a precise car rating assistant that only returns clean JSON."},
+        {"role": "user", "content": prompt}
+    ]
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a precise car rating assistant that only returns clean JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3
-        )
-
-        raw = response.choices[0].message.content.strip()
-
-        try:
-            ratings = json.loads(raw)
-        except json.JSONDecodeError:
-            ratings = {"rawText": raw}
-        print(ratings)
-        return ratings
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-def chat_about_car(car_data, message_history):
-    """Chat with AI about a specific car using conversation history. Don't include any headers or anything that needs to be formatted. Just be conversational."""
+async def get_car_rating_async(vehicle_data):
+    """LLM ratings for one vehicle, used for on-demand rating enrichment: the ratings or {"error"}."""
     key = os.getenv("OPENAI_API_KEY")
     if not key:
         return {"error": "Missing OpenAI API key"}
 
-    client = OpenAI(api_key=key)
+    client = get_async_openai_client()
 
+    # Validate
+    if not vehicle_data:
+        return {"error": "Missing vehicle data"}
+
+    try:
+        return await _complete_structured(client, "rating", _rating_messages(vehicle_data), validate_ratings, 0.3)
+
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def _chat_messages(car_data, message_history):
     # Build system prompt with car information
     car_info = f"""
     Car Details:
@@ -184,15 +211,28 @@ def chat_about_car(car_data, message_history):
     for msg in message_history:
         messages.append(msg)
 
+    return messages
+
+
+async def chat_about_car_async(car_data, message_history):
+    """Chat with AI about a specific car using conversation history. Don't include any headers or anything that needs to be formatted. Just be conversational."""
+    key = os.getenv("OPENAI_API_KEY")
+    if not key:
+        return {"error": "Missing OpenAI API key"}
+
+    client = get_async_openai_client()
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
-            temperature=0.7
-        )
+        with llm_accounting.track("chat", MODEL) as call:
+            response = await client.chat.completions.create(
+                model=MODEL,
+                messages=_chat_messages(car_data, message_history),
+                temperature=0.7
+            )
+            call.record_response(response)
 
         reply = response.choices[0].message.content.strip()
         return {"reply": reply}
 
     except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
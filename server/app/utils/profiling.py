@@ -0,0 +1,227 @@
+"""
+On-demand Request Profiling
+===========================
+Opt-in cProfile hook installed by create_app(). A request is profiled when
+
+    - it carries ``X-Profile: <PROFILE_TOKEN>`` (only when PROFILE_TOKEN is set), or
+    - it is picked by PROFILE_SAMPLE_RATE (0..1, default 0).
+
+Each profile is saved as a pstats file (``python -m pstats``, snakeviz) plus
+a JSON report in PROFILE_DIR. Authorized requests may send
+``X-Profile-Output: inline`` to get the report back instead of the normal
+body. Reports list the hottest frames and the watched hot paths
+(clean_listings, get_car_rating_async, Auto.dev/OpenAI upstream calls).
+
+Only one request per process is profiled at a time; sampled requests that
+arrive while another is being profiled (or while some other profiler owns
+the slot) are served unprofiled. Every request of a worker runs on its one
+event loop thread, so the profile also covers whatever other requests the
+loop interleaved meanwhile: read it together with the watched frames.
+Coroutine times exclude time spent awaiting; upstream waits appear under
+the loop's selector.
+"""
+
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+from quart import g, jsonify, request
+
+from . import metrics
+
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.getenv("TMPDIR", "/tmp"), "revvo-profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+
+# Frames rows reported per profile
+HOTSPOT_LIMIT = 15
+
+# Our hot paths, matched by function name in app code
+WATCHED_FUNCTIONS = {
+    "clean_listings", "estimate_annual_insurance", "score_listings",
+    "get_car_rating_async", "get_car_recommendation_async",
+    "fetch_listings_async", "fetch_all_listings_async", "fetch_photos_async", "fetch_all_photos_async",
+}
+# Upstream client entry points, matched by (package path fragment, function name)
+WATCHED_UPSTREAM = {("httpx", "send"), ("openai", "create"), ("requests", "request")}
+
+# Python 3.12+: cProfile uses sys.monitoring, one profiler per process
+PROCESS_WIDE_PROFILER = sys.version_info >= (3, 12)
+
+# Most recent reports, for /metrics
+RECENT_REPORTS = 20
+_recent = deque(maxlen=RECENT_REPORTS)
+_lock = threading.Lock()
+
+# Held by the request being profiled
+_slot = threading.Lock()
+
+
+class ProfileSession:
+    """The cProfile profile of one request."""
+
+    def __init__(self, inline=False):
+        self.inline = inline
+        self.started = time.perf_counter()
+        self.request_profile = None
+
+    def start(self):
+        import cProfile
+
+        self.request_profile = cProfile.Profile()
+        self.request_profile.enable()
+
+    def stats(self):
+        import pstats
+
+        return pstats.Stats(self.request_profile)
+
+
+def _frame_name(filename, line, name):
+    if filename == "~":
+        return name
+    return f"{os.path.relpath(filename) if filename.startswith(os.getcwd()) else filename}:{line}({name})"
+
+
+def _is_watched(filename, name):
+    if name in WATCHED_FUNCTIONS and f"{os.sep}app{os.sep}" in filename:
+        return True
+    return any(package in filename and name == func for package, func in WATCHED_UPSTREAM)
+
+
+def build_report(stats, wall_ms):
+    """
+    Summarize merged stats.
+
+    Returns:
+        dict: {"wallMs", "hotspots": [...], "watched": [...]}, each row
+              {"function", "calls", "totalMs", "cumulativeMs"}, slowest first
+    """
+    rows, watched = [], []
+    for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():
+        if filename == __file__:
+            continue
+        row = {
+            "function": _frame_name(filename, line, name),
+            "calls": calls,
+            "totalMs": round(total * 1000, 2),
+            "cumulativeMs": round(cumulative * 1000, 2),
+        }
+        rows.append(row)
+        if _is_watched(filename, name):
+            watched.append(row)
+    rows.sort(key=lambda row: row["cumulativeMs"], reverse=True)
+    watched.sort(key=lambda row: row["cumulativeMs"], reverse=True)
+    return {"wallMs": round(wall_ms, 1), "hotspots": rows[:HOTSPOT_LIMIT], "watched": watched}
+
+
+def _save(stats, report):
+    """Write <name>.prof and <name>.json into PROFILE_DIR, pruning the oldest files."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", request.path).strip("-") or "root"
+    name = f"{int(time.time() * 1000)}-{request.method}-{slug}"
+    stats.dump_stats(os.path.join(PROFILE_DIR, f"{name}.prof"))
+    with open(os.path.join(PROFILE_DIR, f"{name}.json"), "w") as f:
+        json.dump(report, f, indent=2)
+
+    files = sorted(f for f in os.listdir(PROFILE_DIR) if f.endswith((".prof", ".json")))
+    for old in files[:max(0, len(files) - 2 * PROFILE_MAX_FILES)]:
+        os.remove(os.path.join(PROFILE_DIR, old))
+    return name
+
+
+def _authorized():
+    header = request.headers.get("X-Profile")
+    return bool(PROFILE_TOKEN and header and hmac.compare_digest(header, PROFILE_TOKEN))
+
+
+def _claim_slot():
+    """Take the process' profiling slot; False when another profile (ours or a foreign tool) holds it."""
+    if not _slot.acquire(blocking=False):
+        return False
+    if PROCESS_WIDE_PROFILER and sys.monitoring.get_tool(sys.monitoring.PROFILER_ID) is not None:
+        _slot.release()
+        return False
+    return True
+
+
+def _stop_request_profile():
+    """Disable the current request's profile and free the slot; returns its session, if any."""
+    session = g.pop("profile_session", None)
+    if session is not None:
+        try:
+            session.request_profile.disable()
+        finally:
+            _slot.release()
+    return session
+
+
+def recent_reports():
+    """Slowest watched frames of the most recently profiled requests."""
+    with _lock:
+        return list(_recent)
+
+
+def init_app(app):
+    """Install the profiling hook; a no-op unless PROFILE_TOKEN or PROFILE_SAMPLE_RATE is set."""
+    if not PROFILE_TOKEN and PROFILE_SAMPLE_RATE <= 0:
+        return
+
+    @app.before_request
+    async def start_profile():
+        authorized = _authorized()
+        if not authorized and random.random() >= PROFILE_SAMPLE_RATE:
+            return
+        if not _claim_slot():
+            metrics.increment("profiling.skipped_busy")
+            return
+        session = ProfileSession(inline=authorized and request.headers.get("X-Profile-Output") == "inline")
+        try:
+            session.start()
+        except ValueError as e:
+            # Another profiling tool grabbed sys.monitoring in the meantime
+            _slot.release()
+            metrics.increment("profiling.skipped_busy")
+            print(f"⚠️ Skipping profile: {e}")
+            return
+        g.profile_session = session
+
+    @app.after_request
+    async def finish_profile(response):
+        session = _stop_request_profile()
+        if session is None:
+            return response
+
+        stats = session.stats()
+        report = build_report(stats, (time.perf_counter() - session.started) * 1000)
+        report.update({"method": request.method, "path": request.path, "status": response.status_code})
+        print(f"🔬 Profiled {request.method} {request.path} in {report['wallMs']} ms; slowest watched: "
+              f"{[(row['function'], row['cumulativeMs']) for row in report['watched'][:3]]}")
+        with _lock:
+            _recent.append({key: report[key] for key in ("method", "path", "status", "wallMs")}
+                           | {"watched": report["watched"][:5]})
+
+        if session.inline:
+            return jsonify({"profile": report})
+        try:
+            name = _save(stats, report)
+            if _authorized():
+                response.headers["X-Profile-Report"] = name
+        except OSError as e:
+            print(f"⚠️ Failed to save profile: {e}")
+        return response
+
+    @app.teardown_request
+    async def abandon_profile(_exc):
+        # after_request is skipped on unhandled errors: never leave the profiler running
+        _stop_request_profile()
+
+    print(f"🔬 Request profiling enabled (sample rate {PROFILE_SAMPLE_RATE}, token {'set' if PROFILE_TOKEN else 'unset'})")
+
@@ -0,0 +1,170 @@
+"""
+Auto.dev Query Planner
+======================
+Turns LLM recommendations into the smallest set of Auto.dev queries:
+make/model names are normalized, exact repeats dropped, and same-model
+recommendations for consecutive years merged into one year-range query.
+Results are spread back to the recommendations they came from.
+"""
+
+from . import metrics
+
+# Common shorthand the LLM (or users) use for makes
+MAKE_ALIASES = {
+    "chevy": "Chevrolet",
+    "vw": "Volkswagen",
+    "volkswagon": "Volkswagen",
+    "mercedes": "Mercedes-Benz",
+    "mercedes benz": "Mercedes-Benz",
+    "benz": "Mercedes-Benz",
+    "land-rover": "Land Rover",
+    "range rover": "Land Rover",
+    "alfa": "Alfa Romeo",
+    "bmw": "BMW",
+    "gmc": "GMC",
+    "mini": "MINI",
+}
+
+MAX_QUERY_LIMIT = 25
+
+
+def normalize_make(make):
+    cleaned = " ".join(str(make).split())
+    alias = MAKE_ALIASES.get(cleaned.lower())
+    if alias:
+        return alias
+    return cleaned if any(c.isupper() for c in cleaned) else cleaned.title()
+
+
+def normalize_model(model):
+    return " ".join(str(model).split())
+
+
+def _parse_year(year):
+    try:
+        return int(year)
+    except (TypeError, ValueError):
+        return None
+
+
+def _year_runs(recs):
+    """
+    Split one make/model's (year, recommendation) pairs into query year specs.
+
+    A recommendation without a year covers every year, so the group becomes a
+    single open query. Otherwise only consecutive years share a range, so no
+    query fetches a model year nobody recommended.
+
+    Returns:
+        list: (year spec: int, "min-max" or None, [recommendations]) per query
+    """
+    if any(year is None for year, _ in recs):
+        return [(None, [rec for _, rec in recs])]
+
+    runs = []
+    for year, rec in sorted(recs, key=lambda pair: pair[0]):
+        if runs and year - runs[-1][1] <= 1:
+            runs[-1][1] = year
+            runs[-1][2].append(rec)
+        else:
+            runs.append([year, year, [rec]])
+    return [(first if first == last else f"{first}-{last}", run) for first, last, run in runs]
+
+
+def plan_queries(recommendations, per_recommendation_limit=5):
+    """
+    Build merged Auto.dev queries for a list of recommendations.
+
+    Args:
+        recommendations (list): dicts with "make", "model" and optional "year"
+        per_recommendation_limit (int): listings wanted per recommendation
+
+    Returns:
+        list: query dicts with "make", "model", "year" (int, "min-max" range or None),
+              "limit" and the "recommendations" they serve
+    """
+    groups = {}
+    seen = set()
+    complete = 0
+    for rec in recommendations:
+        make, model = rec.get("make"), rec.get("model")
+        if not (make and model):
+            print(f"⚠️ Skipping incomplete recommendation: {rec}")
+            continue
+        complete += 1
+
+        make, model = normalize_make(make), normalize_model(model)
+        year = _parse_year(rec.get("year"))
+        dedupe_key = (make.lower(), model.lower(), year)
+        if dedupe_key in seen:
+            print(f"♻️ Dropping repeated recommendation: {make} {model} ({year or 'any year'})")
+            continue
+        seen.add(dedupe_key)
+
+        group = groups.setdefault((make.lower(), model.lower()), {"make": make, "model": model, "recs": []})
+        group["recs"].append((year, rec))
+
+    plan = []
+    for group in groups.values():
+        for year, recs in _year_runs(group["recs"]):
+            plan.append({
+                "make": group["make"],
+                "model": group["model"],
+                "year": year,
+                "limit": min(MAX_QUERY_LIMIT, per_recommendation_limit * len(recs)),
+                "recommendations": recs,
+            })
+
+    metrics.increment("planner.recommendations", complete)
+    metrics.increment("planner.upstream_calls", len(plan))
+    metrics.increment("planner.calls_saved", complete - len(plan))
+    return plan
+
+
+def _owner(query, listing):
+    """
+    Pick the recommendation a listing belongs to, by model year.
+
+    Returns None for a year none of the query's recommendations asked for.
+    """
+    year = _parse_year(listing.get("vehicle", {}).get("year"))
+    recs = query["recommendations"]
+    for rec in recs:
+        if _parse_year(rec.get("year")) == year:
+            return rec
+    for rec in recs:
+        if _parse_year(rec.get("year")) is None:
+            return rec
+    return None
+
+
+def spread_results(plan, responses):
+    """
+    Map merged query responses back to per-recommendation entries.
+
+    Args:
+        plan (list): queries from plan_queries
+        responses (list): one {"listings": [...]} or {"error": ...} per query
+
+    Returns:
+        list: {"recommendation", "listings" | "error"} entries, as clean_listings expects
+    """
+    car_listings = []
+    for query, response in zip(plan, responses):
+        if "error" in response:
+            car_listings.extend(
+                {"recommendation": rec, "error": response["error"]} for rec in query["recommendations"]
+            )
+            continue
+
+        buckets = {id(rec): [] for rec in query["recommendations"]}
+        for listing in response.get("listings", []):
+            owner = _owner(query, listing)
+            if owner is None:
+                metrics.increment("planner.off_year_listings")
+                continue
+            buckets[id(owner)].append(listing)
+        car_listings.extend(
+            {"recommendation": rec, "listings": buckets[id(rec)]} for rec in query["recommendations"]
+        )
+    return car_listings
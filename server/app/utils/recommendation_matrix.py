@@ -0,0 +1,203 @@
+"""
+Precomputed Recommendation Matrix
+=================================
+Recommendations for every state × budget bucket × use × comfort combination,
+built offline by build_recommendation_matrix.py and served with an O(1) lookup.
+
+An LLM-built matrix spares the listings search its LLM call. A local-built one
+is only a snapshot of recommend_local, which ranks live in under a millisecond
+and keeps model years current, so the search skips it (see ``sources``) and
+none is shipped.
+
+File layout (gzipped JSON):
+    {
+      "version": 2,
+      "source": "local" | "llm",
+      "cellSize": 10,                                 # cars ranked per cell
+      "dims": {"states": [...], "budgets": [...], "uses": [...], "comforts": [...]},
+      "cars": [[make, model, year, price], ...],      # each car stored once
+      "rankings": [[car index, ...], ...],            # each distinct cell list stored once
+      "cells": {"NJ|15000|commute|suv": ranking index, ...}
+    }
+"""
+
+import gzip
+import json
+import os
+
+MATRIX_PATH = os.getenv(
+    "RECOMMENDATION_MATRIX_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "data", "recommendation_matrix.json.gz"),
+)
+
+STATES = [
+    "AK", "AL", "AR", "AZ", "CA", "CO", "CT", "DC", "DE", "FL", "GA", "HI", "IA", "ID", "IL", "IN", "KS",
+    "KY", "LA", "MA", "MD", "ME", "MI", "MN", "MO", "MS", "MT", "NC", "ND", "NE", "NH", "NJ", "NM", "NV",
+    "NY", "OH", "OK", "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VA", "VT", "WA", "WI", "WV", "WY",
+]
+
+# Budget bucket edges. A budget maps to the largest edge not above it and the
+# cell is ranked for that edge, so recommendations never exceed the budget and
+# sit within a step of it. Budgets under the first edge have no cell and are
+# ranked live.
+BUDGET_BUCKETS = [
+    3000, 4000, 5000, 6000, 7500, 9000, 10000, 12500, 15000, 17500, 20000,
+    22500, 25000, 30000, 35000, 40000, 45000, 50000, 60000, 75000, 100000,
+]
+SUB_MINIMUM_BUCKET = 0
+
+# Cars ranked per cell, so lookups can serve ?limit= up to this many
+MATRIX_CELL_SIZE = 10
+# Cars handed to the listings search
+DEFAULT_RECOMMENDATIONS = 3
+
+# Primary-use buckets (matched as keywords in free text), "general" otherwise
+USE_BUCKETS = {
+    "commute": ("commut", "daily", "work commute"),
+    "family": ("family", "kids", "school"),
+    "road trips": ("trip", "weekend", "travel"),
+    "offroad": ("offroad", "off-road", "trail", "camping"),
+    "work": ("tow", "haul", "work truck", "job"),
+    "city": ("city", "urban", "parking"),
+}
+
+# Comfort levels offered by the client's profile setup, "any" otherwise
+COMFORT_LEVELS = ["sports", "luxury", "suv", "sedan", "truck", "compact", "minivan", "electric"]
+
+_matrix = None
+
+
+def budget_bucket(budget):
+    try:
+        budget = float(budget)
+    except (TypeError, ValueError):
+        return BUDGET_BUCKETS[-1]
+    fitting = [edge for edge in BUDGET_BUCKETS if edge <= budget]
+    return fitting[-1] if fitting else SUB_MINIMUM_BUCKET
+
+
+def use_bucket(primary_use):
+    text = str(primary_use or "").lower().replace("_", " ")
+    for bucket, keywords in USE_BUCKETS.items():
+        if any(keyword in text for keyword in keywords):
+            return bucket
+    return "general"
+
+
+def comfort_bucket(comfort):
+    text = str(comfort or "").lower()
+    for level in COMFORT_LEVELS:
+        if level in text:
+            return level
+    return "any"
+
+
+def cell_key(state, budget, primary_use, comfort):
+    """
+    Normalize a query onto its matrix cell.
+
+    The client sends its comfort level as ``primary_use``, so comfort falls
+    back to matching against the use text.
+    """
+    return "|".join((
+        str(state or "").upper(),
+        str(budget_bucket(budget)),
+        use_bucket(primary_use),
+        comfort_bucket(comfort or primary_use),
+    ))
+
+
+def all_cells():
+    """Yield (state, budget, use, comfort) for every cell in the matrix."""
+    for state in STATES:
+        for budget in BUDGET_BUCKETS:
+            for use in ["general", *USE_BUCKETS]:
+                for comfort in ["any", *COMFORT_LEVELS]:
+                    yield state, budget, use, comfort
+
+
+def save_matrix(cells, source, path=MATRIX_PATH, cell_size=MATRIX_CELL_SIZE):
+    """
+    Persist {cell key: [recommendation, ...]} compactly, storing each distinct
+    car and each distinct ranking once (most states share their rankings).
+    """
+    car_index, cars, ranking_index, rankings, indexed_cells = {}, [], {}, [], {}
+    for key, recommendations in cells.items():
+        indices = []
+        for rec in recommendations:
+            car = (rec["make"], rec["model"], rec.get("year"), rec.get("price"))
+            if car not in car_index:
+                car_index[car] = len(cars)
+                cars.append(list(car))
+            indices.append(car_index[car])
+        indices = tuple(indices)
+        if indices not in ranking_index:
+            ranking_index[indices] = len(rankings)
+            rankings.append(list(indices))
+        indexed_cells[key] = ranking_index[indices]
+
+    payload = {
+        "version": 2,
+        "source": source,
+        "cellSize": cell_size,
+        "dims": {
+            "states": STATES,
+            "budgets": BUDGET_BUCKETS,
+            "uses": ["general", *USE_BUCKETS],
+            "comforts": ["any", *COMFORT_LEVELS],
+        },
+        "cars": cars,
+        "rankings": rankings,
+        "cells": indexed_cells,
+    }
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+
+
+def load_matrix(path=MATRIX_PATH):
+    """Load the matrix once per process; returns None when no matrix has been built."""
+    global _matrix
+    if _matrix is None:
+        if not os.path.exists(path):
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+        cars = [
+            {"make": make, "model": model, "year": year, "price": price}
+            for make, model, year, price in payload["cars"]
+        ]
+        rankings = [[cars[i] for i in indices] for indices in payload["rankings"]]
+        _matrix = {
+            "source": payload.get("source"),
+            "cellSize": payload["cellSize"],
+            "cells": {key: rankings[index] for key, index in payload["cells"].items()},
+        }
+        print(f"✅ Loaded recommendation matrix ({len(_matrix['cells'])} cells, source={_matrix['source']})")
+    return _matrix
+
+
+def lookup_recommendations(state, budget, primary_use, comfort, limit=DEFAULT_RECOMMENDATIONS, sources=None):
+    """
+    O(1) matrix lookup for a query.
+
+    A cell holding fewer than its build's cellSize cars already lists every
+    match, so it answers any ``limit``.
+
+    Args:
+        sources (tuple): only serve a matrix built from one of these sources
+                         ("llm", "local"); any source when None
+
+    Returns:
+        list | None: copies of the cell's top ``limit`` recommendations, or None
+                     when the matrix is missing or from another source, has no
+                     such cell, or ranked fewer cars per cell than ``limit``
+    """
+    matrix = load_matrix()
+    if matrix is None or limit > matrix["cellSize"]:
+        return None
+    if sources is not None and matrix["source"] not in sources:
+        return None
+    recommendations = matrix["cells"].get(cell_key(state, budget, primary_use, comfort))
+    if recommendations is None:
+        return None
+    return [dict(rec) for rec in recommendations[:limit]]
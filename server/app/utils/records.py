@@ -0,0 +1,125 @@
+"""
+Compact Listing Records
+=======================
+Memory-lean representation for cleaned listings held in the in-process
+caches and stores.
+
+Every cleaned listing has the same nested layout (history, retailListing,
+vehicle, ratings, insurance.breakdown, insurance.factors), so a record is
+flattened into one tuple of leaf values plus a shared "shape": the tuple of
+key paths, stored once per distinct layout. Short categorical strings (make,
+model, state, body style...) are interned and repeated floats (insurance
+multipliers, ratings) deduplicated, so each distinct value exists once per
+process. The JSON shape is rebuilt only when a record is served.
+"""
+
+import sys
+import threading
+
+# Strings up to this length are treated as categorical and interned; longer
+# ones (URLs) are nearly always unique and are kept as-is.
+MAX_INTERNED_LENGTH = 40
+
+# Bounds on the shared shape and float tables
+MAX_SHAPES = 1024
+MAX_SHARED_FLOATS = 65536
+
+_shapes = {}
+_floats = {}
+_lock = threading.Lock()
+
+class _Empty:
+    """Leaf marker for an empty nested dict (e.g. insurance={} when estimation failed)."""
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        # Unpickle to the module's singleton, so ``is _EMPTY`` holds after a
+        # round trip through a shared cache backend
+        return "_EMPTY"
+
+    def __repr__(self):
+        return "_EMPTY"
+
+
+_EMPTY = _Empty()
+
+
+class CompactRecord:
+    """A flattened dict: shared tuple of key paths + tuple of leaf values."""
+
+    __slots__ = ("shape", "values")
+
+    def __init__(self, shape, values):
+        self.shape = shape
+        self.values = values
+
+    def __repr__(self):
+        return f"CompactRecord({unpack(self)!r})"
+
+
+def _share(table, value, limit):
+    shared = table.get(value)
+    if shared is not None:
+        return shared
+    with _lock:
+        if len(table) < limit:
+            return table.setdefault(value, value)
+    return value
+
+
+def _leaf(value):
+    if isinstance(value, str):
+        return sys.intern(value) if len(value) <= MAX_INTERNED_LENGTH else value
+    if isinstance(value, float):
+        return _share(_floats, value, MAX_SHARED_FLOATS)
+    if isinstance(value, list):
+        return tuple(pack(v) if isinstance(v, dict) else _leaf(v) for v in value)
+    return value
+
+
+def _flatten(record, prefix, paths, values):
+    for key, value in record.items():
+        path = prefix + (_leaf(key),)
+        if isinstance(value, dict) and value:
+            _flatten(value, path, paths, values)
+        else:
+            paths.append(path)
+            values.append(_EMPTY if isinstance(value, dict) else _leaf(value))
+
+
+def pack(record):
+    """Flatten a cleaned listing (or any JSON-like dict) into a CompactRecord."""
+    paths, values = [], []
+    _flatten(record, (), paths, values)
+    return CompactRecord(_share(_shapes, tuple(paths), MAX_SHAPES), tuple(values))
+
+
+def _expand(value):
+    if value is _EMPTY:
+        return {}
+    if isinstance(value, CompactRecord):
+        return unpack(value)
+    if isinstance(value, tuple):
+        return [_expand(v) for v in value]
+    return value
+
+
+def unpack(record):
+    """Rebuild the original nested dict from a CompactRecord."""
+    result = {}
+    for path, value in zip(record.shape, record.values):
+        node = result
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = _expand(value)
+    return result
+
+
+def pack_payload(payload):
+    """Pack the ``listings`` of a /listings/ payload; the small remainder stays as-is."""
+    return {**payload, "listings": {vin: pack(record) for vin, record in payload["listings"].items()}}
+
+
+def unpack_payload(payload):
+    return {**payload, "listings": {vin: unpack(record) for vin, record in payload["listings"].items()}}
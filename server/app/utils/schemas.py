@@ -0,0 +1,137 @@
+"""
+LLM Output Schemas
+==================
+Validation (with a small repair step) for the structured JSON the LLM
+returns for car recommendations and ratings.
+"""
+
+import json
+import re
+from datetime import date
+
+MIN_MODEL_YEAR = 1980
+
+RATING_KEYS = (
+    "dealRating",
+    "fuelEconomyRating",
+    "maintenanceRating",
+    "safetyRating",
+    "ownerSatisfactionRating",
+)
+
+
+class SchemaError(ValueError):
+    """Raised when LLM output can't be repaired into the expected shape."""
+
+
+def max_model_year():
+    """Newest plausible model year: next year's models go on sale during this one."""
+    return date.today().year + 1
+
+
+def extract_json(raw):
+    """
+    Parse JSON out of an LLM reply, tolerating code fences and surrounding prose.
+    """
+    text = (raw or "").strip()
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text)
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    # Fall back to the outermost object/array in the text
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if starts:
+        start = min(starts)
+        end = max(text.rfind("}"), text.rfind("]"))
+        if end > start:
+            try:
+                return json.loads(text[start:end + 1])
+            except json.JSONDecodeError:
+                pass
+    raise SchemaError("response is not valid JSON")
+
+
+def _to_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        cleaned = re.sub(r"[^\d.\-]", "", value)
+        try:
+            return float(cleaned) if "." in cleaned else int(cleaned)
+        except ValueError:
+            return None
+    return None
+
+
+def validate_recommendations(data):
+    """
+    Validate and repair a recommendation payload.
+
+    Accepts {"recommendations": [...]} or a bare list. Items missing a make or
+    model are dropped; years outside a sane range and unparseable prices are
+    cleared rather than rejected.
+
+    Returns:
+        list: [{"make", "model", "year", "price"}, ...]
+    """
+    if isinstance(data, dict):
+        data = data.get("recommendations", data.get("cars"))
+    if not isinstance(data, list):
+        raise SchemaError('expected {"recommendations": [...]} with a list of cars')
+
+    recommendations = []
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        make, model = item.get("make"), item.get("model")
+        if not (isinstance(make, str) and make.strip() and model not in (None, "")):
+            continue
+
+        year = _to_number(item.get("year"))
+        if year is not None and not MIN_MODEL_YEAR <= year <= max_model_year():
+            year = None
+        price = _to_number(item.get("price"))
+
+        recommendations.append({
+            "make": make.strip(),
+            "model": str(model).strip(),
+            "year": int(year) if year is not None else None,
+            "price": price if price is not None and price > 0 else None,
+        })
+
+    if not recommendations:
+        raise SchemaError("no recommendation had both a make and a model")
+    return recommendations
+
+
+def validate_ratings(data):
+    """
+    Validate and repair a rating payload.
+
+    Every category in RATING_KEYS must be present and numeric; values are
+    clamped to 0-5 and rounded to 2 decimals. overallRating is recomputed.
+
+    Returns:
+        dict: the rating categories plus overallRating
+    """
+    if not isinstance(data, dict):
+        raise SchemaError("expected a JSON object of ratings")
+
+    ratings = {}
+    missing = []
+    for key in RATING_KEYS:
+        value = _to_number(data.get(key))
+        if value is None:
+            missing.append(key)
+            continue
+        ratings[key] = round(max(0.0, min(5.0, float(value))), 2)
+
+    if missing:
+        raise SchemaError(f"missing or non-numeric ratings: {', '.join(missing)}")
+
+    ratings["overallRating"] = round(sum(ratings.values()) / len(ratings), 2)
+    return ratings
@@ -0,0 +1,209 @@
+"""
+Deal & Value Scoring Module
+===========================
+Deterministic, local scoring of cleaned listings. Deal quality is measured
+against market statistics (median price per make/model/year/mileage band)
+gathered from the same result set, so no LLM call is needed on the hot path.
+"""
+
+from datetime import date
+from statistics import median
+
+MILEAGE_BAND_SIZE = 25000        # miles per market band
+MIN_MARKET_SAMPLES = 3           # listings needed before a market median is trusted
+ANNUAL_DEPRECIATION = 0.12       # MSRP fallback when the market is too thin
+EXPECTED_MILES_PER_YEAR = 12000
+
+# Usage types that wear a car faster than personal use
+HARD_USAGE_TYPES = {"Commercial", "Rental", "Lease", "Fleet"}
+
+# Ratings the LLM enrichment may contribute on top of the local scores
+LLM_RATING_KEYS = ("fuelEconomyRating", "maintenanceRating", "safetyRating", "ownerSatisfactionRating")
+
+
+def current_year():
+    return date.today().year
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _clamp(value, low=0.0, high=5.0):
+    return max(low, min(high, value))
+
+
+def mileage_band(miles):
+    return int(miles // MILEAGE_BAND_SIZE) if _is_number(miles) else None
+
+
+def _market_keys(vehicle, retail):
+    """
+    Market groups for a listing, most specific first. Groups never span
+    model years: an old car priced against newer ones would look like a steal.
+    """
+    make, model, year = vehicle.get("make"), vehicle.get("model"), vehicle.get("year")
+    return [
+        (make, model, year, mileage_band(retail.get("miles"))),
+        (make, model, year),
+    ]
+
+
+def build_market_stats(results):
+    """
+    Collect median prices per make/model/year/mileage band from a result set.
+
+    Args:
+        results (dict): cleaned listings keyed by VIN
+
+    Returns:
+        dict: market key -> (median price, sample count), including the coarser
+              make/model/year groups used as fallbacks
+    """
+    groups = {}
+    for listing in results.values():
+        vehicle = listing.get("vehicle", {})
+        retail = listing.get("retailListing", {})
+        price = retail.get("price")
+        if not _is_number(price) or price <= 0 or not vehicle.get("make"):
+            continue
+        for key in _market_keys(vehicle, retail):
+            groups.setdefault(key, []).append(price)
+
+    return {key: (median(prices), len(prices)) for key, prices in groups.items()}
+
+
+def expected_price(listing, market_stats):
+    """
+    Estimate a fair price for a listing.
+
+    Uses the most specific same-year market group with enough samples, then
+    falls back to depreciating the base MSRP by age and mileage.
+
+    Returns:
+        tuple: (expected price or None, source: "market" | "msrp" | None, sample count)
+    """
+    vehicle = listing.get("vehicle", {})
+    retail = listing.get("retailListing", {})
+
+    for key in _market_keys(vehicle, retail):
+        stats = market_stats.get(key)
+        if stats and stats[1] >= MIN_MARKET_SAMPLES:
+            return stats[0], "market", stats[1]
+
+    msrp = vehicle.get("baseMsrp")
+    year = vehicle.get("year")
+    if not _is_number(msrp) or msrp <= 0 or not _is_number(year):
+        return None, None, 0
+
+    age = max(0, current_year() - year)
+    estimate = msrp * (1 - ANNUAL_DEPRECIATION) ** age
+    miles = retail.get("miles")
+    if _is_number(miles):
+        expected_miles = max(age, 1) * EXPECTED_MILES_PER_YEAR
+        # ±10% per "year's worth" of mileage off the norm, capped at -30% / +10%
+        mileage_adj = 1 - 0.10 * (miles - expected_miles) / EXPECTED_MILES_PER_YEAR
+        estimate *= _clamp(mileage_adj, 0.70, 1.10)
+    return estimate, "msrp", 0
+
+
+def deal_rating(price, expected):
+    """3.00 at the expected price, +/-0.10 per percent below/above it, clamped to 0-5."""
+    if not _is_number(price) or price <= 0 or not expected:
+        return None
+    ratio = price / expected
+    return round(_clamp(3.0 + (1.0 - ratio) * 10.0), 2)
+
+
+def value_rating(listing):
+    """Condition-driven value score out of 5: age, mileage, history and certification."""
+    vehicle = listing.get("vehicle", {})
+    retail = listing.get("retailListing", {})
+    history = listing.get("history", {}) or {}
+
+    score = 5.0
+
+    year = vehicle.get("year")
+    age = max(0, current_year() - year) if _is_number(year) else None
+    if age is not None:
+        score -= min(1.5, max(0, age - 3) * 0.15)
+
+    miles = retail.get("miles")
+    if _is_number(miles):
+        miles_per_year = miles / max(age or 0, 1)
+        if miles_per_year > EXPECTED_MILES_PER_YEAR:
+            score -= min(1.5, (miles_per_year - EXPECTED_MILES_PER_YEAR) / EXPECTED_MILES_PER_YEAR * 1.5)
+
+    accidents = history.get("accidentCount")
+    if _is_number(accidents):
+        score -= min(2.0, accidents * 0.75)
+
+    owners = history.get("ownerCount")
+    if _is_number(owners):
+        score -= min(1.0, max(0, owners - 1) * 0.25)
+
+    if history.get("usageType") in HARD_USAGE_TYPES:
+        score -= 0.5
+
+    if retail.get("cpo"):
+        score += 0.25
+
+    return round(_clamp(score), 2)
+
+
+def _overall(ratings):
+    values = [v for k, v in ratings.items() if k.endswith("Rating") and k != "overallRating" and _is_number(v)]
+    return round(sum(values) / len(values), 2) if values else None
+
+
+def score_listing(listing, market_stats):
+    """
+    Score a single cleaned listing against precomputed market statistics.
+
+    Returns:
+        dict: dealRating, valueRating, overallRating plus the expected price used
+    """
+    retail = listing.get("retailListing", {})
+    expected, source, samples = expected_price(listing, market_stats)
+
+    ratings = {
+        "dealRating": deal_rating(retail.get("price"), expected),
+        "valueRating": value_rating(listing),
+    }
+    ratings["overallRating"] = _overall(ratings)
+    ratings["expectedPrice"] = round(expected, 2) if expected else None
+    ratings["priceSource"] = source
+    ratings["marketSampleSize"] = samples
+    return ratings
+
+
+def score_listings(results):
+    """
+    Score a whole result set in one pass, writing ``ratings`` onto each listing.
+
+    Args:
+        results (dict): cleaned listings keyed by VIN (modified in place)
+
+    Returns:
+        dict: the same results
+    """
+    market_stats = build_market_stats(results)
+    for listing in results.values():
+        listing["ratings"] = score_listing(listing, market_stats)
+    return results
+
+
+def merge_llm_ratings(local_ratings, llm_ratings):
+    """
+    Layer LLM-only categories (fuel economy, safety, ...) over the local scores.
+
+    The local deal and value scores always win; overallRating is recomputed
+    over every category present.
+    """
+    merged = dict(local_ratings)
+    if isinstance(llm_ratings, dict):
+        for key in LLM_RATING_KEYS:
+            if _is_number(llm_ratings.get(key)):
+                merged[key] = llm_ratings[key]
+    merged["overallRating"] = _overall(merged)
+    return merged
@@ -0,0 +1,134 @@
+"""
+Traffic Capture
+===============
+Opt-in recorder for the real workload shape, replayed by replay_traffic.py.
+Set TRAFFIC_CAPTURE_PATH to append one JSON line per ``GET /listings/`` and
+``POST /listings/chat`` request:
+
+    {"t": unix time, "kind": "search" | "page" | "chat", "params": {...},
+     "status": 200, "latencyMs": 812.4, "cache": "hit" | "miss" | null}
+
+User data is stripped before anything is written: ZIPs are cut to their
+3-digit prefix, budgets rounded to $1,000, search cursors replaced by an
+opaque session id, and chat messages reduced to a salted hash of the
+normalized question (so repeats stay visible) plus lengths. Car details in
+chat keep only make/model/year and a salted car key.
+"""
+
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from quart import g, request
+
+from .chat_cache import normalize_question
+
+TRAFFIC_CAPTURE_PATH = os.getenv("TRAFFIC_CAPTURE_PATH")
+# Salt for question/car hashes; share it across workers to keep keys comparable
+TRAFFIC_CAPTURE_SALT = os.getenv("TRAFFIC_CAPTURE_SALT") or secrets.token_hex(8)
+
+SEARCH_PARAMS = ("state", "radius_miles", "primary_use", "comfort", "make", "model", "model_year")
+MAX_TRACKED_SESSIONS = 1000
+
+_sessions = OrderedDict()        # search cursor -> opaque session id
+_lock = threading.Lock()
+
+
+def _digest(text):
+    return hashlib.sha256(f"{TRAFFIC_CAPTURE_SALT}:{text}".encode("utf-8")).hexdigest()[:12]
+
+
+def _search_params(args):
+    params = {key: args[key].strip() for key in SEARCH_PARAMS if args.get(key)}
+    if "state" in params:
+        params["state"] = params["state"].upper()
+    zip_code = "".join(c for c in args.get("zip", "") if c.isdigit())
+    if len(zip_code) >= 3:
+        params["zip3"] = zip_code[:3]
+    try:
+        params["budget"] = int(round(float(args["budget"]), -3))
+    except (KeyError, TypeError, ValueError):
+        pass
+    return params
+
+
+def _session_id(cursor, create=False):
+    with _lock:
+        if cursor in _sessions or not create:
+            return _sessions.get(cursor)
+        _sessions[cursor] = secrets.token_hex(4)
+        while len(_sessions) > MAX_TRACKED_SESSIONS:
+            _sessions.popitem(last=False)
+        return _sessions[cursor]
+
+
+def _chat_params(data):
+    car = data.get("car") or {}
+    history = data.get("messageHistory") or []
+    question = normalize_question(data.get("message"))
+    car_id = car.get("vin") or car.get("id") or f"{car.get('make')}|{car.get('model')}|{car.get('year')}"
+    return {
+        "carKey": _digest(car_id),
+        "make": car.get("make"),
+        "model": car.get("model"),
+        "year": car.get("year"),
+        "historyLength": len(history),
+        "questionKey": _digest(" ".join(question)),
+        "questionWords": len(question),
+    }
+
+
+def _record(response):
+    if request.path == "/listings/chat":
+        kind, params = "chat", g.capture_chat
+    elif request.args.get("cursor"):
+        kind = "page"
+        params = {"session": _session_id(request.args["cursor"]), "page": request.args.get("page", type=int)}
+    else:
+        kind, params = "search", _search_params(request.args)
+        # Fresh pages and 304 revalidations alike name their session in the header
+        cursor = response.headers.get("X-Search-Cursor")
+        if cursor:
+            params["session"] = _session_id(cursor, create=True)
+
+    return {
+        "t": round(g.capture_wall_time, 3),
+        "kind": kind,
+        "params": params,
+        "status": response.status_code,
+        "latencyMs": round((time.perf_counter() - g.capture_started) * 1000, 1),
+        "cache": response.headers.get("X-Cache"),
+    }
+
+
+def init_app(app):
+    """Install the capture hooks; a no-op unless TRAFFIC_CAPTURE_PATH is set."""
+    if not TRAFFIC_CAPTURE_PATH:
+        return
+
+    @app.before_request
+    async def start_capture():
+        if (request.method, request.path) in (("GET", "/listings/"), ("POST", "/listings/chat")):
+            g.capture_started = time.perf_counter()
+            g.capture_wall_time = time.time()
+            if request.method == "POST":
+                # Before the view appends to messageHistory
+                g.capture_chat = _chat_params(await request.get_json(silent=True) or {})
+
+    @app.after_request
+    async def capture(response):
+        if "capture_started" not in g:
+            return response
+        try:
+            line = json.dumps(_record(response))
+            with _lock, open(TRAFFIC_CAPTURE_PATH, "a") as f:
+                f.write(line + "\n")
+        except Exception as e:
+            print(f"⚠️ Failed to capture request: {e}")
+        return response
+
+    print(f"📼 Capturing /listings/ and /listings/chat traffic to {TRAFFIC_CAPTURE_PATH}")
@@ -0,0 +1,64 @@
+"""
+Build the precomputed recommendation matrix served by /recommendations.
+
+    python build_recommendation_matrix.py                 # local catalog ranking (seconds; the listings search ignores it)
+    python build_recommendation_matrix.py --source llm    # one LLM call per cell (slow, costs tokens)
+"""
+
+import argparse
+import asyncio
+import time
+
+from dotenv import load_dotenv
+
+from app.utils.local_recommendations import recommend_local
+from app.utils.recommendation_matrix import MATRIX_CELL_SIZE, MATRIX_PATH, all_cells, save_matrix
+
+
+async def recommend_for_cell(source, state, budget, use, comfort):
+    use_text = "" if use == "general" else use
+    comfort_text = None if comfort == "any" else comfort
+    if source == "llm":
+        from app.utils.openai import get_car_recommendation_async
+
+        local = recommend_local(state, budget, use_text, comfort_text, limit=MATRIX_CELL_SIZE)
+        response = await get_car_recommendation_async(state, budget, use_text, comfort_text)
+        if "error" in response:
+            print(f"⚠️ LLM failed for {state}/{budget}/{use}/{comfort}, using local ranking")
+            return local
+        # The LLM names a handful of cars; fill the rest of the cell from the local ranking
+        recommendations = response["recommendations"]
+        named = {(rec["make"].lower(), rec["model"].lower()) for rec in recommendations}
+        extra = [rec for rec in local if (rec["make"].lower(), rec["model"].lower()) not in named]
+        return (recommendations + extra)[:MATRIX_CELL_SIZE]
+    return recommend_local(state, budget, use_text, comfort_text, limit=MATRIX_CELL_SIZE)
+
+
+async def build_cells(source, concurrency):
+    """Every cell of the matrix, with at most ``concurrency`` LLM calls in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def build(state, budget, use, comfort):
+        async with semaphore:
+            return f"{state}|{budget}|{use}|{comfort}", await recommend_for_cell(source, state, budget, use, comfort)
+
+    return dict(await asyncio.gather(*(build(*cell) for cell in all_cells())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", choices=["local", "llm"], default="local")
+    parser.add_argument("--output", default=MATRIX_PATH)
+    parser.add_argument("--concurrency", type=int, default=8, help="LLM calls in flight (--source llm)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    started = time.perf_counter()
+    cells = asyncio.run(build_cells(args.source, args.concurrency))
+
+    save_matrix(cells, args.source, args.output)
+    print(f"✅ Built {len(cells)} cells from {args.source} in {time.perf_counter() - started:.1f}s → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
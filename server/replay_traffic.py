@@ -0,0 +1,321 @@
+"""
+Replay captured traffic (TRAFFIC_CAPTURE_PATH) against a running instance.
+
+    # 1. local stand-ins for Auto.dev and OpenAI
+    python replay_traffic.py stubs --port 8100 --latency-ms 300
+
+    # 2. the instance under test, pointed at the stubs
+    AUTO_DEV_BASE_URL=http://localhost:8100 AUTO_DEV_KEY=stub \\
+    OPENAI_BASE_URL=http://localhost:8100/v1 OPENAI_API_KEY=stub uvicorn --port 8000 run:app
+
+    # 3. replay at 1x, 10x, or as fast as possible (--speed 0)
+    python replay_traffic.py replay capture.jsonl --target http://localhost:8000 --speed 10
+
+The replay keeps the captured arrival times, search/page sessions and chat
+repeats, and reports latency percentiles per request kind plus the listings
+and chat answer cache hit ratios (from the X-Cache response header).
+
+Captured chats only carry a salted car key, and the chat cache only answers
+for VINs the instance has listed, so each car key is replayed as one of the
+VINs the replayed searches returned (chats wait for the first one).
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+
+from app.utils.geo import load_zip_index
+
+STUB_MAKES = ["Toyota", "Honda", "Ford", "Subaru", "Mazda", "Hyundai"]
+STUB_COLORS = ["Black", "White", "Silver", "Gray", "Blue", "Red"]
+
+_zips_by_state = {}
+
+
+# --- Upstream stubs ---
+
+def _state_zips(state):
+    if not _zips_by_state:
+        for zip_code, (_, _, zip_state) in load_zip_index()["zips"].items():
+            _zips_by_state.setdefault(zip_state, []).append(zip_code)
+    return _zips_by_state.get(state) or ["10001"]
+
+
+def _stub_listing(make, model, state, year, max_price, seed):
+    rng = random.Random(seed)
+    vin = hashlib.sha1(seed.encode()).hexdigest()[:17].upper()
+    price = rng.randint(5000, max_price)
+    return {
+        "vehicle": {
+            "vin": vin, "make": make, "model": model, "year": year,
+            "baseMsrp": price + rng.randint(5000, 15000), "bodyStyle": "Sedan", "cylinders": 4, "doors": 4,
+            "drivetrain": "FWD", "engine": "2.5L I4", "exteriorColor": rng.choice(STUB_COLORS),
+            "fuel": "Gasoline", "interiorColor": "Black", "seats": 5, "transmission": "Automatic",
+            "trim": "Base", "type": "Car",
+        },
+        "retailListing": {
+            "carfaxUrl": f"https://example.com/carfax/{vin}", "city": "Stubville", "cpo": False,
+            "dealer": "Stub Motors", "miles": rng.randint(1000, 150000), "price": price,
+            "primaryImage": f"https://example.com/photos/{vin}/0.jpg", "state": state, "used": True,
+            "vdp": f"https://example.com/vdp/{vin}", "zip": rng.choice(_state_zips(state)),
+        },
+        "history": {"accidentCount": rng.randint(0, 2), "accidents": [], "oneOwner": rng.random() < 0.5,
+                    "ownerCount": rng.randint(1, 3), "personalUse": True, "usageType": "Personal"},
+    }
+
+
+def create_stub_app(latency_ms):
+    """Flask app answering the Auto.dev listings/photos and OpenAI chat-completions calls we make."""
+    from flask import Flask, request
+
+    app = Flask("upstream_stubs")
+    delay = latency_ms / 1000
+
+    @app.route("/listings")
+    def listings():
+        time.sleep(delay * random.uniform(0.5, 1.5))
+        args = request.args
+        make, model, state = args.get("vehicle.make"), args.get("vehicle.model"), args.get("retailListing.state")
+        years = [int(y) for y in args.get("vehicle.year", "2015-2023").split("-")]
+        max_price = int(args.get("retailListing.price", "0-40000").split("-")[-1] or 40000)
+        page, limit = args.get("page", 1, type=int), args.get("limit", 5, type=int)
+        # Three pages of inventory per query, the last one partial
+        count = limit if page < 3 else (limit // 2 if page == 3 else 0)
+        return {"listings": [
+            _stub_listing(make, model, state, random.Random(f"{make}{i}").randint(years[0], years[-1]),
+                          max(max_price, 6000), f"{make}|{model}|{state}|{page}|{i}")
+            for i in range(count)
+        ]}
+
+    @app.route("/photos/<vin>")
+    def photos(vin):
+        time.sleep(delay * random.uniform(0.2, 0.6))
+        return {"data": {"retail": [f"https://example.com/photos/{vin}/{i}.jpg" for i in range(8)]}}
+
+    @app.route("/v1/chat/completions", methods=["POST"])
+    def chat_completions():
+        body = request.get_json()
+        time.sleep(delay * random.uniform(2, 4))
+        if body.get("response_format", {}).get("type") == "json_object":
+            if "recommendations" in body["messages"][-1]["content"]:
+                content = {"recommendations": [
+                    {"make": make, "model": "Stub", "year": 2019, "price": 18000} for make in STUB_MAKES[:3]
+                ]}
+            else:
+                content = {key: 3.5 for key in ("dealRating", "fuelEconomyRating", "maintenanceRating",
+                                                 "safetyRating", "ownerSatisfactionRating")}
+            content = json.dumps(content)
+        else:
+            content = "It looks like a reasonable choice for the price."
+        prompt_tokens = sum(len(m["content"]) for m in body["messages"]) // 4
+        return {
+            "id": "stub", "object": "chat.completion", "created": int(time.time()), "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                      "total_tokens": prompt_tokens + len(content) // 4},
+        }
+
+    return app
+
+
+def run_stubs(args):
+    from werkzeug.serving import make_server
+
+    print(f"🧪 Upstream stubs on http://localhost:{args.port} ({args.latency_ms} ms base latency)")
+    make_server("0.0.0.0", args.port, create_stub_app(args.latency_ms), threaded=True).serve_forever()
+
+
+# --- Replay ---
+
+def load_capture(path):
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    records.sort(key=lambda record: record["t"])
+    return records
+
+
+def _zip_for_prefix(prefix):
+    return next((zip_code for zip_code in sorted(load_zip_index()["zips"]) if zip_code.startswith(prefix)), None)
+
+
+def _search_query(params):
+    query = {key: value for key, value in params.items() if key not in ("zip3", "session")}
+    if "zip3" in params:
+        query["zip"] = _zip_for_prefix(params["zip3"])
+    return query
+
+
+class ListedVins:
+    """VINs the target has listed so far, handed out to captured car keys one each."""
+
+    def __init__(self):
+        self.pool = []
+        self.seen = set()
+        self.assigned = {}
+        # Set once there is a VIN to hand out, or once every search has finished without one
+        self.listed = asyncio.Event()
+
+    def add(self, vins):
+        for vin in vins:
+            if vin not in self.seen:
+                self.seen.add(vin)
+                self.pool.append(vin)
+        if self.pool:
+            self.listed.set()
+
+    async def vin_for(self, car_key):
+        """The same VIN for every chat about a car key, or None when no search returned listings."""
+        if car_key not in self.assigned:
+            await self.listed.wait()
+            if not self.pool:
+                return None
+            self.assigned[car_key] = self.pool[len(self.assigned) % len(self.pool)]
+        return self.assigned[car_key]
+
+
+def _chat_body(params, vin):
+    question = " ".join(["question", params["questionKey"]] + ["please"] * max(0, params["questionWords"] - 2))
+    history = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": "earlier turn"}
+        for i in range(params["historyLength"])
+    ]
+    if vin is not None:
+        # The server describes listed VINs from its own record
+        car = {"vin": vin}
+    else:
+        car = {"vin": params["carKey"], "make": params.get("make"), "model": params.get("model"),
+               "year": params.get("year"), "price": 18000, "mileage": 50000}
+    return {"car": car, "message": question, "messageHistory": history}
+
+
+async def _send(client, record, cursors, vins, results):
+    kind, params = record["kind"], record["params"]
+    vin = None
+    if kind == "page":
+        cursor = cursors.get(params.get("session"))
+        if cursor is None:
+            results.append({"kind": kind, "skipped": True})
+            return
+        cursor = await cursor
+        if cursor is None:
+            results.append({"kind": kind, "skipped": True})
+            return
+        query = {"cursor": cursor, **({"page": params["page"]} if params.get("page") else {})}
+        request = client.get("/listings/", params=query)
+    elif kind == "search":
+        request = client.get("/listings/", params=_search_query(params))
+    else:
+        vin = await vins.vin_for(params["carKey"])
+        request = client.post("/listings/chat", json=_chat_body(params, vin))
+
+    started = time.perf_counter()
+    try:
+        response = await request
+        status, cache = response.status_code, response.headers.get("X-Cache")
+    except Exception as e:
+        print(f"❌ {kind} failed: {e!r}")
+        response, status, cache = None, None, None
+    results.append({
+        "kind": kind, "status": status, "cache": cache,
+        "latencyMs": (time.perf_counter() - started) * 1000,
+        "unlisted": kind == "chat" and vin is None,
+    })
+
+    body = response.json() if kind != "chat" and status == 200 else {}
+    vins.add(body.get("listings") or {})
+    if kind == "search" and params.get("session"):
+        cursor = body.get("cursor")
+        # Repeat searches share the session of the first one; the earliest answer wins
+        if not cursors[params["session"]].done():
+            cursors[params["session"]].set_result(cursor)
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+def report(results, wall_seconds):
+    print(f"\n📊 Replayed {len(results)} requests in {wall_seconds:.1f}s")
+    print(f"{'kind':<8}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'cache hit':>11}")
+    for kind in ("search", "page", "chat"):
+        rows = [r for r in results if r["kind"] == kind and not r.get("skipped")]
+        if not rows:
+            continue
+        latencies = [r["latencyMs"] for r in rows]
+        errors = sum(1 for r in rows if r["status"] is None or r["status"] >= 500)
+        cached = [r["cache"] for r in rows if r["cache"]]
+        hit_ratio = f"{cached.count('hit') / len(cached):.0%}" if cached else "-"
+        print(f"{kind:<8}{len(rows):>7}{errors:>8}{percentile(latencies, 50):>10.1f}{percentile(latencies, 90):>10.1f}"
+              f"{percentile(latencies, 99):>10.1f}{max(latencies):>10.1f}{hit_ratio:>11}")
+    unlisted = sum(1 for r in results if r.get("unlisted"))
+    if unlisted:
+        print(f"⚠️ {unlisted} chats had no listed VIN to ask about and could not use the chat cache")
+    skipped = sum(1 for r in results if r.get("skipped"))
+    if skipped:
+        print(f"⚠️ Skipped {skipped} page requests whose search was not captured or failed")
+
+
+async def replay(args):
+    import httpx
+
+    records = load_capture(args.capture)
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        print("⚠️ Nothing to replay")
+        return
+
+    loop = asyncio.get_running_loop()
+    cursors = {
+        record["params"]["session"]: loop.create_future()
+        for record in records if record["kind"] == "search" and record["params"].get("session")
+    }
+    vins, results, tasks, searches = ListedVins(), [], [], []
+    t0, started = records[0]["t"], time.perf_counter()
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.target, timeout=args.timeout, limits=limits) as client:
+        for record in records:
+            if args.speed > 0:
+                delay = (record["t"] - t0) / args.speed - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            task = asyncio.create_task(_send(client, record, cursors, vins, results))
+            tasks.append(task)
+            if record["kind"] == "search":
+                searches.append(task)
+        await asyncio.gather(*searches)
+        vins.listed.set()
+        await asyncio.gather(*tasks)
+    report(results, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stubs = commands.add_parser("stubs", help="serve local Auto.dev/OpenAI stand-ins")
+    stubs.add_argument("--port", type=int, default=8100)
+    stubs.add_argument("--latency-ms", type=float, default=300)
+
+    replay_cmd = commands.add_parser("replay", help="replay a capture file against a target instance")
+    replay_cmd.add_argument("capture")
+    replay_cmd.add_argument("--target", default="http://localhost:8000")
+    replay_cmd.add_argument("--speed", type=float, default=1.0, help="time compression factor; 0 = no pacing")
+    replay_cmd.add_argument("--concurrency", type=int, default=100, help="max open connections")
+    replay_cmd.add_argument("--timeout", type=float, default=60)
+    replay_cmd.add_argument("--limit", type=int, help="replay only the first N requests")
+
+    args = parser.parse_args()
+    if args.command == "stubs":
+        run_stubs(args)
+    else:
+        asyncio.run(replay(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Admission control: class priority, shedding, and cache hits bypassing the search gate.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from server.app import create_app
+from server.app.routes import listings as listings_routes
+from server.app.utils import admission, autodev
+from server.app.utils.admission import AdmissionController
+from server.app.utils.cache import listings_cache, search_sessions
+
+CLASSES = {"search": (1, 1, 0.2), "interactive": (2, 2, 0.2)}
+
+
+def test_interactive_requests_go_first():
+    async def scenario():
+        controller = AdmissionController(CLASSES, max_in_flight=2)
+        assert await controller.acquire("search") and await controller.acquire("interactive")
+
+        order = []
+
+        async def wait(name):
+            if await controller.acquire(name):
+                order.append(name)
+
+        # The search queues first, then an interactive request queues behind the full worker
+        search = asyncio.create_task(wait("search"))
+        await asyncio.sleep(0.02)
+        interactive = asyncio.create_task(wait("interactive"))
+        await asyncio.sleep(0.02)
+        await controller.release("interactive")
+        await interactive
+        assert order == ["interactive"]
+
+        # The queued search gives up within its budget while the slot stays busy
+        await search
+        assert order == ["interactive"]
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_is_shed_immediately():
+    async def scenario():
+        controller = AdmissionController({"search": (1, 0, 5.0), "interactive": (1, 0, 5.0)}, max_in_flight=2)
+        assert await controller.acquire("search")
+        started = time.monotonic()
+        assert not await controller.acquire("search")
+        assert time.monotonic() - started < 0.1
+
+    asyncio.run(scenario())
+
+
+def test_queued_requests_do_not_hold_threads():
+    async def scenario():
+        controller = AdmissionController({"search": (200, 0, 1.0), "interactive": (1, 0, 1.0)}, max_in_flight=400)
+
+        async def search():
+            assert await controller.acquire("search")
+            await asyncio.sleep(0.2)
+            await controller.release("search")
+
+        # Hundreds of in-flight searches share the one event loop thread
+        started = time.monotonic()
+        await asyncio.gather(*(search() for _ in range(200)))
+        assert time.monotonic() - started < 1.0
+        assert threading.active_count() == threads
+
+    threads = threading.active_count()
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setenv("AUTO_DEV_KEY", "test")
+
+    async def fetch_listings_async(client, query, state, budget, headers):
+        return {"listings": [{
+            "vehicle": {"vin": "VIN1", "make": "Toyota", "model": "Camry", "year": 2019},
+            "retailListing": {"price": 18000, "miles": 40000, "state": "NJ"},
+        }]}
+
+    async def fetch_all_photos_async(vins, headers):
+        return {vin: ["https://example.com/0.jpg"] for vin in vins}
+
+    monkeypatch.setattr(autodev, "fetch_listings_async", fetch_listings_async)
+    monkeypatch.setattr(listings_routes, "fetch_all_photos_async", fetch_all_photos_async)
+    monkeypatch.setattr(admission, "controller", AdmissionController(CLASSES, max_in_flight=4))
+    listings_cache.clear()
+    search_sessions.clear()
+    yield create_app()
+    listings_cache.clear()
+    search_sessions.clear()
+
+
+def test_saturated_search_class_still_serves_cache_hits(app):
+    async def scenario():
+        client = app.test_client()
+        cached = await client.get("/listings/?state=NJ&make=Toyota&model=Camry")
+        assert cached.status_code == 200
+
+        # Occupy every search slot and queue position
+        admission.controller.in_flight["search"] = 1
+        admission.controller.waiting["search"] = 1
+
+        hit = await client.get("/listings/?state=NJ&make=Toyota&model=Camry")
+        assert hit.status_code == 200 and hit.headers["X-Cache"] == "hit"
+        revalidated = await client.get("/listings/?state=NJ&make=Toyota&model=Camry",
+                                       headers={"If-None-Match": cached.headers["ETag"]})
+        assert revalidated.status_code == 304
+
+        cold = await client.get("/listings/?state=NJ&make=Honda&model=Civic")
+        assert cold.status_code == 503 and cold.headers["Retry-After"]
+
+        # Interactive routes have their own slots
+        assert (await client.get("/listings/photos?vins=VIN1")).status_code == 200
+
+    asyncio.run(scenario())
+
+
+def test_identical_cold_searches_take_one_search_slot(app, monkeypatch):
+    fetch = autodev.fetch_listings_async
+
+    async def slow_fetch(*args):
+        await asyncio.sleep(0.1)
+        return await fetch(*args)
+
+    monkeypatch.setattr(autodev, "fetch_listings_async", slow_fetch)
+
+    async def scenario():
+        client = app.test_client()
+        # One slot and one queue position: only the builder may need them, the rest wait on its build
+        responses = await asyncio.gather(*(client.get("/listings/?state=NJ&make=Toyota&model=Camry") for _ in range(5)))
+        assert [response.status_code for response in responses] == [200] * 5
+        assert sorted(response.headers["X-Cache"] for response in responses) == ["hit"] * 4 + ["miss"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,95 @@
+"""
+Cache backends: compact-record round trips and single-flight recompute on
+the memory, SQLite and Redis (fakeredis) backends.
+"""
+
+import asyncio
+
+import pytest
+
+from server.app.utils.cache import TTLCache
+from server.app.utils.cache_backends import RedisCache, SQLiteCache
+from server.app.utils.records import pack_payload, unpack_payload
+
+BACKENDS = ["memory", "sqlite", "redis"]
+
+
+def make_backend(kind, tmp_path, compact=False):
+    if kind == "memory":
+        return TTLCache(ttl=60, compact=compact, name="test")
+    if kind == "sqlite":
+        return SQLiteCache(ttl=60, compact=compact, name="test", path=str(tmp_path / "cache.sqlite3"))
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisCache(ttl=60, compact=compact, name="test", client=fakeredis.FakeRedis())
+
+
+LISTING = {
+    "history": {"accidentCount": 0, "oneOwner": True},
+    "retailListing": {"price": 18500, "miles": 42000, "images": "https://example.com/0.jpg"},
+    "vehicle": {"make": "Toyota", "model": "Camry", "year": 2019},
+    "insurance": {},
+    "ratings": {"dealRating": 3.4, "valueRating": 4.1, "priceSource": None},
+}
+
+
+@pytest.mark.parametrize("kind", BACKENDS)
+def test_packed_payload_round_trips(kind, tmp_path):
+    payload = {"items": 1, "listings": {"VIN1": LISTING}, "filters": {"makes": ["Toyota"]}}
+    cache = make_backend(kind, tmp_path)
+    cache.set("key", {"payload": pack_payload(payload), "etag": "abc"})
+    assert unpack_payload(cache.get("key")["payload"]) == payload
+
+
+@pytest.mark.parametrize("kind", BACKENDS)
+def test_compact_cache_round_trips(kind, tmp_path):
+    cache = make_backend(kind, tmp_path, compact=True)
+    cache.set("VIN1", LISTING)
+    assert cache.get("VIN1") == LISTING
+    cache.delete("VIN1")
+    assert cache.get("VIN1") is None
+
+
+@pytest.mark.parametrize("kind", BACKENDS)
+def test_per_entry_ttl(kind, tmp_path):
+    cache = make_backend(kind, tmp_path)
+    cache.set("short", [], ttl=0.01)
+    cache.set("long", ["a.jpg"])
+    asyncio.run(asyncio.sleep(0.05))
+    assert cache.get("short") is None
+    assert cache.get("long") == ["a.jpg"]
+
+
+@pytest.mark.parametrize("kind", BACKENDS)
+def test_single_flight_computes_once(kind, tmp_path):
+    cache = make_backend(kind, tmp_path)
+    computed = []
+
+    async def request():
+        async with cache.single_flight("key", timeout=5) as value:
+            if value is None:
+                computed.append(1)
+                await asyncio.sleep(0.2)
+                value = "built"
+                cache.set("key", value)
+            return value
+
+    async def burst():
+        return await asyncio.gather(*(request() for _ in range(10)))
+
+    assert asyncio.run(burst()) == ["built"] * 10
+    assert len(computed) == 1
+
+
+@pytest.mark.parametrize("kind", BACKENDS)
+def test_single_flight_waiters_give_up_after_timeout(kind, tmp_path):
+    cache = make_backend(kind, tmp_path)
+    token = cache.try_lock("key", 5)
+    assert token is not None and cache.try_lock("key", 5) is None
+
+    async def waiter():
+        async with cache.single_flight("key", timeout=0.1) as value:
+            return value
+
+    assert asyncio.run(waiter()) is None
+    cache.release_lock("key", token)
+    assert cache.try_lock("key", 5) is not None
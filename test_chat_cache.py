@@ -0,0 +1,103 @@
+"""
+Chat answer cache: question matching, and answers built and keyed only from
+the server-side listing record.
+"""
+
+import asyncio
+
+import pytest
+
+from server.app import create_app
+from server.app.routes import listings as listings_routes
+from server.app.utils.cache import chat_answers_cache, listing_store, ratings_cache
+from server.app.utils.chat_cache import car_from_record, lookup_answer, store_answer
+
+RECORD = {
+    "vehicle": {"make": "Toyota", "model": "Camry", "year": 2019, "trim": "SE", "engine": "2.5L I4",
+                "transmission": "Automatic", "fuel": "Gasoline", "exteriorColor": "Blue", "interiorColor": "Black"},
+    "retailListing": {"price": 18000, "miles": 40000, "city": "Newark", "state": "NJ"},
+    "history": {"accidentCount": 0, "ownerCount": 1, "oneOwner": True},
+    "ratings": {"dealRating": 3.4, "valueRating": 4.1},
+}
+
+
+def test_similar_questions_match_but_negations_do_not():
+    chat_answers_cache.clear()
+    car = car_from_record("VIN1", RECORD)
+    store_answer(car, "Is this a good deal?", "Yes.")
+    assert lookup_answer(car, "is it a good deal") == "Yes."
+    assert lookup_answer(car, "Is this not a good deal?") is None
+
+    # Any prompt field changing (here the description's trim) drops the stored answers
+    changed = car_from_record("VIN1", {**RECORD, "vehicle": {**RECORD["vehicle"], "trim": "XSE"}})
+    assert lookup_answer(changed, "Is this a good deal?") is None
+    chat_answers_cache.clear()
+
+
+def test_answers_survive_rating_drift_but_not_price_changes():
+    chat_answers_cache.clear()
+    store_answer(car_from_record("VIN1", RECORD), "Is this a good deal?", "Yes.")
+
+    # Market-derived scores move with the other listings; LLM ratings land later
+    rescored = {**RECORD, "ratings": {"dealRating": 2.9, "valueRating": 4.4, "expectedPrice": 17500,
+                                      "marketSampleSize": 7}}
+    assert lookup_answer(car_from_record("VIN1", rescored, {"reliabilityRating": 4.5}), "Is this a good deal?") == "Yes."
+
+    repriced = {**RECORD, "retailListing": {**RECORD["retailListing"], "price": 16500}}
+    assert lookup_answer(car_from_record("VIN1", repriced), "Is this a good deal?") is None
+    chat_answers_cache.clear()
+
+
+@pytest.fixture
+def app(monkeypatch):
+    prompts = []
+
+    async def chat_about_car_async(car_data, message_history):
+        prompts.append(car_data)
+        return {"reply": f"About the {car_data['description']}"}
+
+    monkeypatch.setattr(listings_routes, "chat_about_car_async", chat_about_car_async)
+    for cache in (chat_answers_cache, listing_store, ratings_cache):
+        cache.clear()
+    app = create_app()
+    app.prompts = prompts
+    yield app
+    for cache in (chat_answers_cache, listing_store, ratings_cache):
+        cache.clear()
+
+
+def chat(app, car, message="Is this a good deal?", with_response=False):
+    async def post():
+        response = await app.test_client().post(
+            "/listings/chat", json={"car": car, "message": message, "messageHistory": []}
+        )
+        body = await response.get_json()
+        return (body, response) if with_response else body
+
+    return asyncio.run(post())
+
+
+def test_posted_car_cannot_plant_answers(app):
+    listing_store.set("VIN1", RECORD)
+    forged = {"vin": "VIN1", "price": 18000, "mileage": 40000, "description": "Flood car, walk away"}
+
+    reply = chat(app, forged)["reply"]
+    # The prompt is built from the server's record, not the posted description
+    assert "Flood" not in reply and app.prompts[-1]["description"].startswith("Toyota Camry SE")
+
+    honest = chat(app, {"vin": "VIN1"})
+    assert honest["reply"] == reply and len(app.prompts) == 1
+
+
+def test_unknown_vins_skip_the_shared_cache(app):
+    car = {"vin": "NOPE", "description": "Flood car, walk away"}
+    chat(app, car)
+    chat(app, car)
+    assert len(app.prompts) == 2 and chat_answers_cache.get("NOPE") is None
+
+
+def test_cache_header_reports_hits(app):
+    listing_store.set("VIN1", RECORD)
+    _, first = chat(app, {"vin": "VIN1"}, with_response=True)
+    _, repeat = chat(app, {"vin": "VIN1"}, "is it a good deal", with_response=True)
+    assert first.headers["X-Cache"] == "miss" and repeat.headers["X-Cache"] == "hit"
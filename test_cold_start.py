@@ -0,0 +1,64 @@
+"""
+Cold-start import budget for the Vercel entry point (api/index.py).
+
+Runs the import under `python -X importtime` in a fresh interpreter and fails
+if heavy SDKs land back on the import path or the total cost exceeds budget.
+Override the budget with COLD_START_BUDGET_MS on slow machines.
+"""
+
+import os
+import subprocess
+import sys
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api")
+COLD_START_BUDGET_MS = int(os.getenv("COLD_START_BUDGET_MS", "400"))
+
+# Modules that must only be imported on first use, never at cold start
+LAZY_MODULES = {"openai", "requests", "httpx"}
+
+
+def run_in_fresh_interpreter(code, *flags):
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=API_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def parse_importtime(stderr):
+    """Return {module: cumulative_us} from `-X importtime` output."""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        cumulative[name] = int(cumulative_us)
+    return cumulative
+
+
+def test_entry_point_skips_heavy_sdks():
+    result = run_in_fresh_interpreter("import index", "-X", "importtime")
+    imported = parse_importtime(result.stderr)
+    eager = sorted(LAZY_MODULES & set(imported))
+    assert not eager, f"heavy modules imported at cold start: {eager}"
+
+
+def test_entry_point_import_budget():
+    result = run_in_fresh_interpreter("import index", "-X", "importtime")
+    total_ms = parse_importtime(result.stderr)["index"] / 1000
+    assert total_ms <= COLD_START_BUDGET_MS, (
+        f"cold-start import took {total_ms:.0f}ms (budget {COLD_START_BUDGET_MS}ms)"
+    )
+
+
+def test_healthz_needs_no_heavy_dependencies():
+    code = (
+        "import asyncio, sys, index\n"
+        "resp = asyncio.run(index.app.test_client().get('/api/healthz'))\n"
+        "assert resp.status_code == 200, resp.status_code\n"
+        f"print(sorted(set(sys.modules) & {LAZY_MODULES!r}))\n"
+    )
+    result = run_in_fresh_interpreter(code)
+    assert result.stdout.strip() == "[]", f"/healthz pulled in: {result.stdout.strip()}"
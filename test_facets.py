@@ -0,0 +1,54 @@
+"""
+Incremental facets: merging accumulators and histogram buckets.
+"""
+
+from server.app.utils.facets import MILES_BUCKET_SIZE, PRICE_BUCKET_SIZE, FacetAccumulator
+
+
+def listing(make, model, price=None, miles=None, year=2019):
+    return {"vehicle": {"make": make, "model": model, "year": year},
+            "retailListing": {"price": price, "miles": miles}}
+
+
+def test_merge_keeps_ranges_when_either_side_has_none():
+    priced = FacetAccumulator().add(listing("Toyota", "Camry", price=18000, miles=None))
+    unpriced = FacetAccumulator().add(listing("Honda", "Civic", price=None, miles=52000))
+    merged = FacetAccumulator().merge(priced).merge(unpriced)
+    filters = merged.to_filters()
+    assert filters["priceRange"] == {"min": 18000, "max": 18000}
+    assert filters["mileageRange"] == {"min": 52000, "max": 52000}
+
+    cheaper = FacetAccumulator().add(listing("Toyota", "Corolla", price=12000, miles=90000))
+    merged.merge(cheaper)
+    filters = merged.to_filters()
+    assert filters["priceRange"] == {"min": 12000, "max": 18000}
+    assert filters["mileageRange"] == {"min": 52000, "max": 90000}
+    assert FacetAccumulator().merge(FacetAccumulator()).to_filters()["priceRange"] == {"min": None, "max": None}
+
+
+def test_merge_adds_model_counts_per_make():
+    first = FacetAccumulator().add(listing("Toyota", "Camry")).add(listing("Toyota", "Camry"))
+    second = FacetAccumulator().add(listing("Toyota", "Camry")).add(listing("Toyota", "RAV4"))
+    second.add(listing("Honda", "Civic"))
+    counts = first.merge(second).to_filters()["counts"]
+    assert counts["listings"] == 5
+    assert counts["makes"] == {"Toyota": 4, "Honda": 1}
+    assert counts["models"] == {"Toyota": {"Camry": 3, "RAV4": 1}, "Honda": {"Civic": 1}}
+    # The merged-in accumulator is left alone
+    assert second.to_filters()["counts"]["models"]["Toyota"] == {"Camry": 1, "RAV4": 1}
+
+
+def test_histogram_buckets_are_half_open_and_sorted():
+    facets = FacetAccumulator()
+    for price, miles in ((PRICE_BUCKET_SIZE * 3, 0), (PRICE_BUCKET_SIZE * 3 - 1, MILES_BUCKET_SIZE - 1),
+                         (PRICE_BUCKET_SIZE * 3 + 1, MILES_BUCKET_SIZE)):
+        facets.add(listing("Toyota", "Camry", price=price, miles=miles))
+    histograms = facets.to_filters()["histograms"]
+    assert histograms["price"] == [
+        {"min": 2 * PRICE_BUCKET_SIZE, "max": 3 * PRICE_BUCKET_SIZE, "count": 1},
+        {"min": 3 * PRICE_BUCKET_SIZE, "max": 4 * PRICE_BUCKET_SIZE, "count": 2},
+    ]
+    assert histograms["miles"] == [
+        {"min": 0, "max": MILES_BUCKET_SIZE, "count": 2},
+        {"min": MILES_BUCKET_SIZE, "max": 2 * MILES_BUCKET_SIZE, "count": 1},
+    ]
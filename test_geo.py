@@ -0,0 +1,40 @@
+"""
+ZIP radius search: the centroid index and radius filtering of listings.
+"""
+
+from server.app.routes.listings import _sort_by_distance, _within_radius
+from server.app.utils.geo import lookup_zip, normalize_zip, states_within, zips_within
+
+
+def test_normalize_zip():
+    assert normalize_zip("07030-1234") == "07030"
+    assert normalize_zip(7030) == "07030"
+    assert normalize_zip("n/a") is None
+
+
+def test_zips_within_is_sorted_and_bounded():
+    matches = zips_within("10001", 10)
+    assert matches[0][0] == "10001" and matches[0][1] == 0
+    assert all(distance <= 10 for _, distance, _ in matches)
+    assert [distance for _, distance, _ in matches] == sorted(distance for _, distance, _ in matches)
+    # Manhattan's radius reaches into New Jersey
+    assert states_within("10001", 10)[0] == "NY" and "NJ" in states_within("10001", 10)
+    assert lookup_zip("00000") is None and zips_within("00000", 10) == []
+
+
+def test_radius_filter_keeps_unknown_zips_last():
+    distances = {zip_code: distance for zip_code, distance, _ in zips_within("10001", 10)}
+    near = next(zip_code for zip_code, distance in distances.items() if distance > 1)
+    raw = [{"listings": [
+        {"retailListing": {"zip": "90210"}},      # known, far away
+        {"retailListing": {"zip": "00000"}},      # not in the centroid table
+        {"retailListing": {"zip": near}},
+        {"retailListing": {"zip": "10001"}},
+    ]}]
+    kept = [listing["retailListing"]["zip"] for listing in _within_radius(raw, distances)[0]["listings"]]
+    assert kept == ["00000", near, "10001"]
+
+    results = {zip_code: {"retailListing": {"zip": zip_code}} for zip_code in kept}
+    ordered = _sort_by_distance(results, distances)
+    assert list(ordered) == ["10001", near, "00000"]
+    assert ordered["00000"]["retailListing"]["distanceMiles"] is None
@@ -0,0 +1,124 @@
+"""
+/listings/ search sessions: cursor paging, VIN dedupe across pages and ETags.
+"""
+
+import asyncio
+
+import pytest
+
+from server.app import create_app
+from server.app.routes import listings as listings_routes
+from server.app.utils import autodev
+from server.app.utils.cache import listings_cache, search_sessions
+
+
+def raw_listing(vin, year=2019):
+    return {
+        "vehicle": {"vin": vin, "make": "Toyota", "model": "Camry", "year": year, "baseMsrp": 26000},
+        "retailListing": {"price": 18000, "miles": 40000, "state": "NJ", "city": "Newark", "vdp": f"https://x/{vin}"},
+        "history": {"accidentCount": 0, "ownerCount": 1},
+    }
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setenv("AUTO_DEV_KEY", "test")
+    # Page 2 repeats one VIN from page 1
+    inventory = {1: ["VIN1", "VIN2", "VIN3", "VIN4", "VIN5"], 2: ["VIN5", "VIN6"]}
+
+    async def fetch_listings_async(client, query, state, budget, headers):
+        return {"listings": [raw_listing(vin) for vin in inventory.get(query["page"], [])]}
+
+    plans = []
+
+    def plan_queries(recommendations):
+        plans.append(recommendations)
+        return real_plan_queries(recommendations)
+
+    real_plan_queries = listings_routes.plan_queries
+    monkeypatch.setattr(autodev, "fetch_listings_async", fetch_listings_async)
+    monkeypatch.setattr(listings_routes, "plan_queries", plan_queries)
+    listings_cache.clear()
+    search_sessions.clear()
+    app = create_app()
+    app.plans = plans
+    yield app
+    listings_cache.clear()
+    search_sessions.clear()
+
+
+SEARCH = "/listings/?state=NJ&make=Toyota&model=Camry"
+
+
+def test_pages_dedupe_vins_and_reuse_the_plan(app):
+    async def scenario():
+        client = app.test_client()
+        first = await client.get(SEARCH)
+        body = await first.get_json()
+        assert first.status_code == 200 and body["hasMore"] is True
+        assert first.headers["X-Search-Cursor"] == body["cursor"]
+
+        second = await client.get(f"/listings/?cursor={body['cursor']}")
+        assert second.status_code == 200
+        assert set((await second.get_json())["listings"]) == {"VIN6"}
+        assert len(app.plans) == 1
+
+    asyncio.run(scenario())
+
+
+def test_etag_is_a_content_hash_across_sessions(app):
+    async def scenario():
+        client = app.test_client()
+        first = await client.get(SEARCH)
+        listings_cache.clear()
+        # Same inventory, new session: the tag must not change with the cursor
+        second = await client.get(SEARCH)
+        assert (await first.get_json())["cursor"] != (await second.get_json())["cursor"]
+        assert first.headers["ETag"] == second.headers["ETag"]
+
+        listings_cache.clear()
+        revalidated = await client.get(SEARCH, headers={"If-None-Match": first.headers["ETag"]})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["X-Search-Cursor"]
+
+    asyncio.run(scenario())
+
+
+def test_cached_first_page_is_a_miss_once_its_session_is_gone(app):
+    async def scenario():
+        client = app.test_client()
+        first = await client.get(SEARCH)
+        assert (await client.get(SEARCH)).headers["X-Cache"] == "hit"
+
+        search_sessions.clear()
+        rebuilt = await client.get(SEARCH, headers={"If-None-Match": first.headers["ETag"]})
+        # Same content, so still a 304, but handing out a cursor that pages
+        assert rebuilt.status_code == 304 and rebuilt.headers["X-Cache"] == "miss"
+        cursor = rebuilt.headers["X-Search-Cursor"]
+        assert cursor != first.headers["X-Search-Cursor"]
+        assert (await client.get(f"/listings/?cursor={cursor}")).status_code == 200
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_fetches_of_a_page_merge_its_facets_once(app, monkeypatch):
+    fetch = autodev.fetch_listings_async
+
+    async def slow_fetch(*args):
+        await asyncio.sleep(0.05)
+        return await fetch(*args)
+
+    async def scenario():
+        client = app.test_client()
+        cursor = (await (await client.get(SEARCH)).get_json())["cursor"]
+        monkeypatch.setattr(autodev, "fetch_listings_async", slow_fetch)
+
+        pages = await asyncio.gather(*(client.get(f"/listings/?cursor={cursor}&page=2") for _ in range(2)))
+        for response in pages:
+            assert (await response.get_json())["filters"]["counts"]["listings"] == 6
+        # The slower fetch serves the page the faster one stored
+        assert sorted(response.headers["X-Cache"] for response in pages) == ["hit", "miss"]
+        page_three_base = search_sessions.get(cursor)["facets"]
+        assert page_three_base.to_filters()["counts"]["makes"] == {"Toyota": 6}
+
+    asyncio.run(scenario())
@@ -0,0 +1,47 @@
+"""
+Local catalog ranking: budget handling and open-ended catalog years.
+"""
+
+import asyncio
+
+import pytest
+
+from server.app import create_app
+from server.app.utils.local_recommendations import (
+    load_catalog, newest_affordable_year, parse_budget, recommend_local,
+)
+from server.app.utils.scoring import current_year
+
+
+def test_parse_budget():
+    assert parse_budget("15000") == 15000.0
+    assert parse_budget(None) is None and parse_budget("") is None
+    for bad in ("-5000", "0", "nan", "inf", "cheap"):
+        with pytest.raises(ValueError):
+            parse_budget(bad)
+
+
+def test_bad_budgets_rank_without_one():
+    assert recommend_local("NJ", -5000, "commute", "suv") == recommend_local("NJ", None, "commute", "suv")
+
+
+def test_models_still_sold_follow_the_calendar():
+    corolla = next(entry for entry in load_catalog() if entry["model"] == "Corolla")
+    assert corolla["years"][1] is None
+    assert newest_affordable_year(corolla, None) == current_year()
+    # Discontinued models keep their last year
+    fit = next(entry for entry in load_catalog() if entry["model"] == "Fit")
+    assert newest_affordable_year(fit, None) == fit["years"][1]
+
+
+@pytest.mark.parametrize("path", [
+    "/listings/?state=NJ&primary_use=suv&budget=-5000",
+    "/recommendations/?state=NJ&budget=-5000",
+])
+def test_routes_reject_non_positive_budgets(path):
+    async def get():
+        response = await create_app().test_client().get(path)
+        return response.status_code, await response.get_json()
+
+    status, body = asyncio.run(get())
+    assert status == 400 and "budget" in body["error"]
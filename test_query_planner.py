@@ -0,0 +1,63 @@
+"""
+Auto.dev query planner: merging, year ranges and spreading results back.
+"""
+
+from server.app.utils.query_planner import plan_queries, spread_results
+
+
+def listing(year, vin):
+    return {"vehicle": {"vin": vin, "year": year}}
+
+
+def test_repeats_and_aliases_share_one_query():
+    plan = plan_queries([
+        {"make": "chevy", "model": "Malibu", "year": 2019},
+        {"make": "Chevrolet", "model": " Malibu ", "year": 2019},
+    ])
+    assert len(plan) == 1
+    assert plan[0]["make"] == "Chevrolet" and plan[0]["year"] == 2019
+    assert len(plan[0]["recommendations"]) == 1
+
+
+def test_consecutive_years_merge_into_a_range():
+    plan = plan_queries([
+        {"make": "Toyota", "model": "Camry", "year": 2019},
+        {"make": "Toyota", "model": "Camry", "year": 2020},
+    ])
+    assert [query["year"] for query in plan] == ["2019-2020"]
+    assert plan[0]["limit"] == 10
+
+
+def test_distant_years_are_not_merged():
+    plan = plan_queries([
+        {"make": "Toyota", "model": "Camry", "year": 2015},
+        {"make": "Toyota", "model": "Camry", "year": 2022},
+        {"make": "Toyota", "model": "Camry", "year": 2021},
+    ])
+    assert sorted(str(query["year"]) for query in plan) == ["2015", "2021-2022"]
+
+
+def test_any_year_recommendation_opens_the_whole_model():
+    plan = plan_queries([
+        {"make": "Honda", "model": "Civic", "year": 2016},
+        {"make": "Honda", "model": "Civic"},
+    ])
+    assert len(plan) == 1 and plan[0]["year"] is None
+
+
+def test_spread_assigns_by_year_and_drops_unrequested_years():
+    recs = [
+        {"make": "Toyota", "model": "Camry", "year": 2019},
+        {"make": "Toyota", "model": "Camry", "year": 2020},
+    ]
+    plan = plan_queries(recs)
+    entries = spread_results(plan, [{"listings": [listing(2019, "A"), listing(2020, "B"), listing(2018, "C")]}])
+
+    by_year = {entry["recommendation"]["year"]: [l["vehicle"]["vin"] for l in entry["listings"]] for entry in entries}
+    assert by_year == {2019: ["A"], 2020: ["B"]}
+
+
+def test_spread_reports_errors_per_recommendation():
+    recs = [{"make": "Ford", "model": "F-150", "year": 2018}, {"make": "Ford", "model": "F-150", "year": 2019}]
+    entries = spread_results(plan_queries(recs), [{"error": "Auto.dev returned 500"}])
+    assert [entry["error"] for entry in entries] == ["Auto.dev returned 500"] * 2
@@ -0,0 +1,39 @@
+"""
+LLM recommendation hedge: one shared deadline for waiting and calling.
+"""
+
+import asyncio
+import time
+
+from server.app.routes import listings as listings_routes
+from server.app.utils.cache import recommendations_cache
+
+HEDGE = 0.3
+
+
+def test_concurrent_misses_never_wait_past_the_hedge(monkeypatch):
+    calls = []
+
+    async def slow_llm(*args):
+        calls.append(args)
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(listings_routes, "LLM_HEDGE_TIMEOUT", HEDGE)
+    monkeypatch.setattr(listings_routes, "lookup_recommendations", lambda *args, **kwargs: None)
+    monkeypatch.setattr(listings_routes, "get_car_recommendation_async", slow_llm)
+    recommendations_cache.clear()
+
+    async def timed():
+        started = time.monotonic()
+        recommendations = await listings_routes._hedged_recommendations("NJ", 15000, "commute", "sedan")
+        return time.monotonic() - started, recommendations
+
+    async def burst():
+        return await asyncio.gather(*(timed() for _ in range(5)))
+
+    results = asyncio.run(burst())
+    # Only the lock holder asks the LLM; the waiters fall back when the shared deadline passes
+    assert len(calls) == 1
+    assert max(elapsed for elapsed, _ in results) < HEDGE + 0.15
+    assert all(recommendations for _, recommendations in results)
+    recommendations_cache.clear()
@@ -0,0 +1,51 @@
+"""
+Recommendation matrix: budget buckets, cell lookups and the ?limit= bounds.
+"""
+
+import asyncio
+
+import pytest
+
+from server.app import create_app
+from server.app.utils import recommendation_matrix
+from server.app.utils.recommendation_matrix import (
+    MATRIX_CELL_SIZE, budget_bucket, cell_key, load_matrix, lookup_recommendations, save_matrix,
+)
+
+
+def test_budget_bucket_never_exceeds_the_budget():
+    assert budget_bucket(9999) == 9000
+    assert budget_bucket(10000) == 10000
+    assert budget_bucket(250000) == 100000
+    # Below the first edge there is no cell to round up to
+    assert budget_bucket(2500) == 0
+    assert budget_bucket(None) == 100000
+
+
+def test_lookup_serves_limits_up_to_the_cell_size(tmp_path, monkeypatch):
+    monkeypatch.setattr(recommendation_matrix, "_matrix", None)
+    cars = [{"make": f"Make{i}", "model": "Model", "year": 2020, "price": 9000} for i in range(5)]
+    full, short = cell_key("NJ", 9000, "commute", "sedan"), cell_key("NJ", 9000, "commute", "suv")
+    path = tmp_path / "matrix.json.gz"
+    save_matrix({full: cars, short: cars[:2]}, "local", path=path, cell_size=5)
+    load_matrix(path)
+
+    assert [rec["make"] for rec in lookup_recommendations("nj", 9500, "daily commute", "sedan")] == ["Make0", "Make1", "Make2"]
+    assert len(lookup_recommendations("NJ", 9500, "commute", "sedan", limit=5)) == 5
+    # A short cell already lists every match
+    assert len(lookup_recommendations("NJ", 9500, "commute", "suv", limit=5)) == 2
+    # Past the cell size, or below the smallest bucket, callers rank live
+    assert lookup_recommendations("NJ", 9500, "commute", "sedan", limit=6) is None
+    assert lookup_recommendations("NJ", 1500, "commute", "sedan") is None
+    # The listings search only takes LLM-built cells
+    assert lookup_recommendations("NJ", 9500, "commute", "sedan", sources=("llm",)) is None
+
+
+@pytest.mark.parametrize("limit", ["-2", "0", "abc", str(MATRIX_CELL_SIZE + 1)])
+def test_recommendations_reject_out_of_range_limits(limit):
+    async def get():
+        response = await create_app().test_client().get(f"/recommendations/?state=NJ&limit={limit}")
+        return response.status_code, await response.get_json()
+
+    status, body = asyncio.run(get())
+    assert status == 400 and "limit" in body["error"]
@@ -0,0 +1,50 @@
+"""
+LLM output schemas: JSON extraction and recommendation/rating repair.
+"""
+
+from datetime import date
+
+import pytest
+
+from server.app.utils.schemas import SchemaError, extract_json, validate_ratings, validate_recommendations
+
+
+def test_extract_json_tolerates_fences_and_prose():
+    assert extract_json('```json\n{"a": 1}\n```') == {"a": 1}
+    assert extract_json('Sure! Here you go: [1, 2] Enjoy.') == [1, 2]
+    with pytest.raises(SchemaError):
+        extract_json("no json here")
+
+
+def test_recommendations_are_repaired_not_rejected():
+    recs = validate_recommendations({"recommendations": [
+        {"make": " Toyota ", "model": "Camry", "year": "2019", "price": "$18,500"},
+        {"make": "Honda", "model": "Civic", "year": 1950, "price": -1},
+        {"make": "", "model": "Nameless"},
+        "not a car",
+    ]})
+    assert recs == [
+        {"make": "Toyota", "model": "Camry", "year": 2019, "price": 18500},
+        {"make": "Honda", "model": "Civic", "year": None, "price": None},
+    ]
+
+
+def test_next_model_year_is_accepted():
+    next_year = date.today().year + 1
+    recs = validate_recommendations([
+        {"make": "Kia", "model": "EV9", "year": next_year},
+        {"make": "Kia", "model": "EV6", "year": next_year + 1},
+    ])
+    assert [rec["year"] for rec in recs] == [next_year, None]
+
+
+def test_ratings_are_clamped_and_overall_recomputed():
+    ratings = validate_ratings({
+        "dealRating": 7, "fuelEconomyRating": "4.5", "maintenanceRating": 4,
+        "safetyRating": 3.5, "ownerSatisfactionRating": 4, "overallRating": 1,
+    })
+    assert ratings["dealRating"] == 5.0
+    assert ratings["overallRating"] == 4.2
+
+    with pytest.raises(SchemaError):
+        validate_ratings({"dealRating": 3})
@@ -0,0 +1,66 @@
+"""
+Local deal/value scoring: market group fallback order and the MSRP estimate.
+"""
+
+import pytest
+
+from server.app.utils.scoring import (
+    ANNUAL_DEPRECIATION, build_market_stats, current_year, expected_price, score_listings,
+)
+
+
+def listing(year, price, miles=40000, msrp=None, make="Toyota", model="Camry"):
+    return {
+        "vehicle": {"make": make, "model": model, "year": year, "baseMsrp": msrp},
+        "retailListing": {"price": price, "miles": miles},
+        "history": {},
+    }
+
+
+def test_old_cars_are_not_priced_against_newer_ones():
+    results = {
+        "OLD1": listing(2015, 9000, msrp=24000), "OLD2": listing(2015, 9400, msrp=24000),
+        "NEW1": listing(2022, 23500), "NEW2": listing(2022, 24000), "NEW3": listing(2022, 24500),
+    }
+    score_listings(results)
+    # Too few 2015s for a market median: the MSRP estimate is used, not the 2022 prices
+    assert results["OLD1"]["ratings"]["priceSource"] == "msrp"
+    assert results["OLD1"]["ratings"]["expectedPrice"] < 9000
+    assert results["OLD1"]["ratings"]["dealRating"] < 5.0
+    assert results["NEW2"]["ratings"]["priceSource"] == "market"
+    assert results["NEW2"]["ratings"]["expectedPrice"] == 24000
+
+
+def test_fallback_order_band_then_year_then_msrp():
+    results = {f"A{i}": listing(2020, 20000 + i * 100, miles=30000) for i in range(3)}
+    results.update({f"B{i}": listing(2020, 15000 + i * 100, miles=90000) for i in range(2)})
+    results["LONE"] = listing(2018, 14000, msrp=26000)
+    results["BARE"] = listing(2017, 12000)
+    stats = build_market_stats(results)
+
+    # Enough listings in the car's own mileage band
+    assert expected_price(results["A0"], stats) == (20100, "market", 3)
+    # Its band is too thin: the same-year group (all five 2020s) is next
+    assert expected_price(results["B0"], stats) == (20000, "market", 5)
+    # No market for its year: depreciated MSRP
+    assert expected_price(results["LONE"], stats)[1:] == ("msrp", 0)
+    # Nothing to go on
+    assert expected_price(results["BARE"], stats) == (None, None, 0)
+    assert ("Toyota", "Camry") not in stats
+
+
+def test_msrp_estimate_depreciates_by_age_and_mileage():
+    age = 4
+    year = current_year() - age
+    base = 30000 * (1 - ANNUAL_DEPRECIATION) ** age
+
+    on_norm = listing(year, 15000, miles=age * 12000, msrp=30000)
+    assert expected_price(on_norm, {})[0] == pytest.approx(base)
+
+    # One year's worth of extra miles takes 10% off; the adjustment is capped at -30% / +10%
+    high = listing(year, 15000, miles=age * 12000 + 12000, msrp=30000)
+    assert expected_price(high, {})[0] == pytest.approx(base * 0.9)
+    worn = listing(year, 15000, miles=400000, msrp=30000)
+    assert expected_price(worn, {})[0] == pytest.approx(base * 0.7)
+    barely_driven = listing(year, 15000, miles=0, msrp=30000)
+    assert expected_price(barely_driven, {})[0] == pytest.approx(base * 1.1)
@@ -0,0 +1,44 @@
+"""
+Traffic capture: search sessions are recorded from the X-Search-Cursor header.
+"""
+
+import asyncio
+import json
+
+from server.app import create_app
+from server.app.utils import autodev, traffic_capture
+from server.app.utils.cache import listings_cache, search_sessions
+
+SEARCH = "/listings/?state=NJ&make=Toyota&model=Camry"
+
+
+def test_revalidated_searches_keep_their_session(tmp_path, monkeypatch):
+    capture = tmp_path / "capture.jsonl"
+    monkeypatch.setenv("AUTO_DEV_KEY", "test")
+    monkeypatch.setattr(traffic_capture, "TRAFFIC_CAPTURE_PATH", str(capture))
+
+    async def fetch_listings_async(client, query, state, budget, headers):
+        return {"listings": [{
+            "vehicle": {"vin": "VIN1", "make": "Toyota", "model": "Camry", "year": 2019},
+            "retailListing": {"price": 18000, "miles": 40000, "state": "NJ"},
+        }]}
+
+    monkeypatch.setattr(autodev, "fetch_listings_async", fetch_listings_async)
+    listings_cache.clear()
+    search_sessions.clear()
+
+    async def scenario():
+        client = create_app().test_client()
+        first = await client.get(SEARCH)
+        revalidated = await client.get(SEARCH, headers={"If-None-Match": first.headers["ETag"]})
+        assert revalidated.status_code == 304
+        await client.get(f"/listings/?cursor={revalidated.headers['X-Search-Cursor']}")
+
+    asyncio.run(scenario())
+    listings_cache.clear()
+    search_sessions.clear()
+
+    search, repeat, page = [json.loads(line) for line in capture.read_text().splitlines()]
+    assert (search["kind"], repeat["kind"], page["kind"]) == ("search", "search", "page")
+    assert repeat["status"] == 304
+    assert search["params"]["session"] == repeat["params"]["session"] == page["params"]["session"]